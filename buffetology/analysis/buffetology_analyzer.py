@@ -1,15 +1,57 @@
-from typing import Dict, List, Any, Tuple, Optional
+import operator
+from typing import Dict, List, Any, Tuple, Optional, Union
+import numpy as np
 import pandas as pd
+from buffetology.analysis.scoring_kernels import (
+    METRIC_ORDER, REQUIRED_METRICS, Thresholds, growth_score, quality_score, score_all, value_score
+)
 from buffetology.data_fetchers.base_fetcher import BaseDataFetcher
 from buffetology.config.config_loader import ConfigLoader
 import yaml
 
+# Membership set for the presence check in analyze_ticker
+_REQUIRED_METRICS = frozenset(REQUIRED_METRICS)
+
+# Columns and dtypes of the frame returned by analyze_stocks
+_RESULT_COLUMNS = (
+    'ticker', 'quality_score', 'value_score', 'growth_score', 'overall_score', 'recommendation'
+)
+_RECOMMENDATIONS = pd.CategoricalDtype(
+    ['Strong Buy', 'Buy', 'Hold', 'Sell', 'Strong Sell', 'Not enough data', 'Error']
+)
+_RESULT_DTYPES = {
+    'ticker': 'string',
+    'quality_score': 'float32',
+    'value_score': 'float32',
+    'growth_score': 'float32',
+    'overall_score': 'float32',
+    'recommendation': _RECOMMENDATIONS
+}
+
+# Lower bounds of the overall score for each recommendation above 'Strong Sell'
+_BINS = np.array([30, 40, 60, 80], dtype=np.float64)
+_LABELS = np.array(['Strong Sell', 'Sell', 'Hold', 'Buy', 'Strong Buy'])
+
+# Screening criteria as (metric, Thresholds field, comparison)
+_SCREEN_CRITERIA = (
+    ('earningsGrowth', 'min_eps_growth', operator.ge),
+    ('currentRatio', 'min_current_ratio', operator.ge),
+    ('debtToEquity', 'debt_to_equity_threshold', operator.le)
+)
+
+def _results_frame(data: Dict[str, Any]) -> pd.DataFrame:
+    """Build a results frame with the declared dtypes, skipping type inference."""
+    return pd.DataFrame(data, columns=list(_RESULT_COLUMNS)).astype(_RESULT_DTYPES)
+
 class BuffetologyAnalyzer:
     def __init__(self, data_fetcher: BaseDataFetcher, config: ConfigLoader):
         """Initialize the analyzer with a data fetcher and configuration."""
         self.data_fetcher = data_fetcher
         self.config = config
         self.results = {}
+        # Thresholds are read once; the score kernels only need plain floats
+        self.th = Thresholds.from_config(self.config.get_analysis_config())
+        self._thresholds = self.th.as_array()
 
     def analyze_ticker(self, ticker: str) -> Dict[str, Any]:
         """Analyze a single ticker and return a dictionary of scores."""
@@ -18,32 +60,18 @@ class BuffetologyAnalyzer:
             metrics = self.data_fetcher.get_key_metrics(ticker)
             
             # Check if we have sufficient data
-            required_metrics = [
-                'debtToEquity', 'currentRatio', 'returnOnEquity', 'profitMargins',
-                'trailingPE', 'priceToBook', 'pegRatio', 'marketCap',
-                'revenueGrowth', 'earningsGrowth'
-            ]
-            
-            if metrics.empty or not all(metric in metrics.columns for metric in required_metrics):
-                return {
-                    'ticker': ticker,
-                    'quality_score': 0,
-                    'value_score': 0,
-                    'growth_score': 0,
-                    'overall_score': 0,
-                    'recommendation': 'Not enough data'
-                }
-            
-            # Calculate scores
-            quality_score = self._calculate_quality_score(metrics)
-            value_score = self._calculate_value_score(metrics)
-            growth_score = self._calculate_growth_score(metrics)
+            labels = metrics.index if isinstance(metrics, pd.Series) else metrics.columns
+            if metrics.empty or not _REQUIRED_METRICS.issubset(labels):
+                return self._zero_result(ticker, 'Not enough data')
+
+            # Validate once, then score the plain float row
+            row = self._metric_row(metrics)
+            if np.isnan(row[:len(REQUIRED_METRICS)]).any():
+                return self._zero_result(ticker, 'Not enough data')
+            quality_score, value_score, growth_score = (float(score) for score in self._score_row(row))
             
             # Calculate overall score (weighted average)
-            overall_score = (quality_score * 0.4 + value_score * 0.3 + growth_score * 0.3)
-            
-            # Determine recommendation
-            recommendation = self._get_recommendation(overall_score)
+            overall_score = quality_score * 0.4 + value_score * 0.3 + growth_score * 0.3
             
             return {
                 'ticker': ticker,
@@ -51,211 +79,214 @@ class BuffetologyAnalyzer:
                 'value_score': value_score,
                 'growth_score': growth_score,
                 'overall_score': overall_score,
-                'recommendation': recommendation
+                'recommendation': self._get_recommendation(overall_score)
             }
             
         except Exception as e:
             print(f"Error analyzing {ticker}: {str(e)}")
-            return {
-                'ticker': ticker,
-                'quality_score': 0,
-                'value_score': 0,
-                'growth_score': 0,
-                'overall_score': 0,
-                'recommendation': 'Error'
-            }
+            return self._zero_result(ticker, 'Error')
+
+    def _zero_result(self, ticker: str, recommendation: str) -> Dict[str, Any]:
+        """Build the result for a ticker that could not be scored."""
+        return {
+            'ticker': ticker,
+            'quality_score': 0,
+            'value_score': 0,
+            'growth_score': 0,
+            'overall_score': 0,
+            'recommendation': recommendation
+        }
 
-    def _get_recommendation(self, overall_score: float) -> str:
-        """Get recommendation based on overall score."""
-        if overall_score >= 80:
-            return 'Strong Buy'
-        elif overall_score >= 60:
-            return 'Buy'
-        elif overall_score >= 40:
-            return 'Hold'
-        elif overall_score >= 30:
-            return 'Sell'
-        else:
-            return 'Strong Sell'
+    def _get_recommendation(self, overall_score: Union[float, np.ndarray]) -> Union[str, np.ndarray]:
+        """Get recommendation based on overall score, or an array of them for an array of scores."""
+        labels = _LABELS[np.searchsorted(_BINS, overall_score, side='right')]
+        return labels if isinstance(labels, np.ndarray) else str(labels)
 
     def analyze_stocks(self, tickers: List[str]) -> pd.DataFrame:
         """Analyze multiple stocks and return results as a DataFrame."""
-        results = []
-        for ticker in tickers:
-            result = self.analyze_ticker(ticker)
-            results.append(result)
-            
-        # Convert results to DataFrame
-        results_df = pd.DataFrame(results)
-        
+        return self.analyze_batch(tickers)
+
+    def analyze_batch(self, tickers: List[str]) -> pd.DataFrame:
+        """Fetch metrics for all tickers and score them in one vectorized pass."""
+        tickers = list(dict.fromkeys(tickers))
+        try:
+            metrics = self.data_fetcher.get_key_metrics_bulk(tickers)
+        except Exception as e:
+            print(f"Error fetching key metrics: {str(e)}")
+            metrics = pd.DataFrame()
+
+        # Tickers the fetcher could not return are reported as errors
+        fetched = [ticker for ticker in tickers if ticker in metrics.index]
+        failed = [ticker for ticker in tickers if ticker not in metrics.index]
+        metrics = metrics.reindex(index=fetched, columns=METRIC_ORDER)
+
+        try:
+            results = [self._score_metrics(metrics)]
+        except Exception as e:
+            print(f"Error analyzing batch: {str(e)}")
+            results = []
+            failed.extend(fetched)
+
+        if failed or not results:
+            results.append(_results_frame({
+                'ticker': failed,
+                'quality_score': 0.0,
+                'value_score': 0.0,
+                'growth_score': 0.0,
+                'overall_score': 0.0,
+                'recommendation': 'Error'
+            }))
+        results_df = pd.concat(results, ignore_index=True) if len(results) > 1 else results[0]
+
         # Sort by overall score
-        results_df = results_df.sort_values('overall_score', ascending=False)
-        
-        return results_df
+        return results_df.sort_values('overall_score', ascending=False)
 
     def analyze_sp500(self, limit: Optional[int] = None) -> pd.DataFrame:
         """Analyze top S&P 500 stocks."""
         if limit is None:
             limit = self.config.get_analysis_config().get('sp500_top_n', 50)
         
-        tickers = self.data_fetcher.get_sp500_tickers()[:limit]
+        tickers = self.data_fetcher.get_sp500_tickers_cached(limit)
         return self.analyze_stocks(tickers)
 
-    def _calculate_quality_score(self, metrics: pd.DataFrame) -> float:
-        """Calculate quality score based on financial metrics."""
-        score = 0
-        max_score = 100
-        analysis_config = self.config.get_analysis_config()
-
+    def screen(self, tickers: List[str]) -> pd.DataFrame:
+        """Return the metrics of the tickers that pass the screening thresholds, indexed by ticker."""
+        tickers = list(dict.fromkeys(tickers))
+        metrics = self.data_fetcher.get_key_metrics_bulk(tickers)
         if metrics.empty:
-            return 0
+            return metrics
+        return metrics.loc[self._screen_mask(metrics)]
 
-        # Check debt levels
-        debt_to_equity = metrics['debtToEquity'].iloc[0] if 'debtToEquity' in metrics else None
-        if debt_to_equity is not None and debt_to_equity > 0:
-            if debt_to_equity <= analysis_config['debt_to_equity_threshold']:
-                score += 20
-
-        # Check current ratio
-        current_ratio = metrics['currentRatio'].iloc[0] if 'currentRatio' in metrics else None
-        if current_ratio is not None and current_ratio > 0:
-            if current_ratio >= analysis_config['min_current_ratio']:
-                score += 20
-
-        # Check profitability
-        roe = metrics['returnOnEquity'].iloc[0] if 'returnOnEquity' in metrics else None
-        if roe is not None and roe > 0:
-            if roe >= analysis_config['min_roe']:
-                score += 20
+    def _screen_mask(self, metrics: pd.DataFrame) -> np.ndarray:
+        """Compare whole metric columns against the thresholds; True where a ticker passes all of them."""
+        mask = np.ones(len(metrics.index), dtype=bool)
+        for column, key, compare in _SCREEN_CRITERIA:
+            threshold = getattr(self.th, key)
+            if column not in metrics.columns:
+                return np.zeros(len(metrics.index), dtype=bool)
+            values = metrics[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            # NaN fails every comparison, so a missing metric or unset threshold screens the ticker out
+            with np.errstate(invalid='ignore'):
+                mask &= compare(values, threshold)
+        return mask
 
-        # Check profit margins
-        profit_margins = metrics['profitMargins'].iloc[0] if 'profitMargins' in metrics else None
-        if profit_margins is not None and profit_margins > 0:
-            if profit_margins >= analysis_config['min_net_margin']:
-                score += 20
+    def _score_metrics(self, metrics: pd.DataFrame) -> pd.DataFrame:
+        """Score a frame of metrics indexed by ticker, one row per ticker."""
+        X = self._metric_matrix(metrics)
+        has_data = ~np.isnan(X[:, :len(REQUIRED_METRICS)]).any(axis=1)
+        scores = self._score_matrix(X)
+        scores[~has_data] = 0
 
-        # Check market cap
-        market_cap = metrics['marketCap'].iloc[0] if 'marketCap' in metrics else None
-        if market_cap is not None and market_cap > 0:
-            if market_cap >= analysis_config['min_market_cap']:
-                score += 20
+        # Calculate overall score (weighted average)
+        overall_score = scores[:, 0] * 0.4 + scores[:, 1] * 0.3 + scores[:, 2] * 0.3
+        recommendation = np.where(has_data, self._get_recommendation(overall_score), 'Not enough data')
 
-        return min(score, max_score)
+        return _results_frame({
+            'ticker': metrics.index,
+            'quality_score': scores[:, 0],
+            'value_score': scores[:, 1],
+            'growth_score': scores[:, 2],
+            'overall_score': overall_score,
+            'recommendation': recommendation
+        })
 
-    def _calculate_value_score(self, metrics: pd.DataFrame) -> float:
-        """Calculate value score based on financial metrics."""
-        score = 0
-        max_score = 100
-        analysis_config = self.config.get_analysis_config()
+    def _metric_matrix(self, metrics: pd.DataFrame) -> np.ndarray:
+        """Select the scored metrics as a contiguous float matrix, missing values as NaN."""
+        values = metrics.reindex(columns=METRIC_ORDER).to_numpy(dtype=np.float64, na_value=np.nan)
+        return np.ascontiguousarray(values)
 
-        if metrics.empty:
-            return 0
+    def _metric_row(self, metrics: Union[pd.Series, pd.DataFrame]) -> np.ndarray:
+        """Select the scored metrics of one ticker as floats; all NaN when there is no row.
 
-        # Check P/E ratio
-        pe_ratio = metrics['trailingPE'].iloc[0] if 'trailingPE' in metrics else None
-        if pe_ratio is not None and pe_ratio > 0:
-            if pe_ratio <= analysis_config['max_pe_ratio']:
-                score += 25
-
-        # Check P/B ratio
-        pb_ratio = metrics['priceToBook'].iloc[0] if 'priceToBook' in metrics else None
-        if pb_ratio is not None and pb_ratio > 0:
-            if pb_ratio <= analysis_config['max_pb_ratio']:
-                score += 25
-
-        # Check PEG ratio
-        peg_ratio = metrics['pegRatio'].iloc[0] if 'pegRatio' in metrics else None
-        if peg_ratio is not None and peg_ratio > 0:
-            if peg_ratio <= analysis_config['max_peg_ratio']:
-                score += 25
-
-        # Check market cap
-        market_cap = metrics['marketCap'].iloc[0] if 'marketCap' in metrics else None
-        if market_cap is not None and market_cap > 0:
-            if market_cap >= analysis_config['min_market_cap']:
-                score += 25
+        Accepts a Series of metrics or a DataFrame, whose first row is used.
+        """
+        if isinstance(metrics, pd.Series):
+            return metrics.reindex(METRIC_ORDER).to_numpy(dtype=np.float64, na_value=np.nan)
+        if len(metrics.index) == 0:
+            return np.full(len(METRIC_ORDER), np.nan)
+        return self._metric_matrix(metrics.head(1))[0]
 
-        return min(score, max_score)
+    def _first_row(self, metrics: Union[pd.Series, pd.DataFrame]) -> Optional[pd.Series]:
+        """Return the metrics of one ticker as a Series, or None when there are none."""
+        if isinstance(metrics, pd.Series):
+            return None if metrics.empty else metrics
+        return None if metrics.empty else metrics.iloc[0]
 
-    def _calculate_growth_score(self, metrics: pd.DataFrame) -> float:
-        """Calculate growth score based on financial metrics."""
-        score = 0
-        max_score = 100
-        analysis_config = self.config.get_analysis_config()
+    def _metric_value(self, row: pd.Series, name: str) -> Optional[float]:
+        """Get a metric from a row as a float, or None when it is missing."""
+        value = row.get(name)
+        return None if value is None or pd.isna(value) else float(value)
 
-        if metrics.empty:
-            return 0
+    def _score_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Return (quality, value, growth) scores for each row of the metric matrix."""
+        return score_all(X, self._thresholds)
 
-        # Check revenue growth
-        revenue_growth = metrics['revenueGrowth'].iloc[0] if 'revenueGrowth' in metrics else None
-        if revenue_growth is not None and revenue_growth > 0:
-            if revenue_growth >= analysis_config['min_revenue_growth']:
-                score += 33.33
+    def _score_row(self, row: np.ndarray) -> np.ndarray:
+        """Return (quality, value, growth) scores for a single metric row."""
+        return score_all(row.reshape(1, -1), self._thresholds)[0]
 
-        # Check earnings growth
-        earnings_growth = metrics['earningsGrowth'].iloc[0] if 'earningsGrowth' in metrics else None
-        if earnings_growth is not None and earnings_growth > 0:
-            if earnings_growth >= analysis_config['min_earnings_growth']:
-                score += 33.33
+    def _calculate_quality_score(self, metrics: Union[pd.Series, pd.DataFrame]) -> float:
+        """Calculate quality score based on financial metrics."""
+        return float(quality_score(self._metric_row(metrics), self._thresholds))
 
-        # Check free cash flow growth (not directly available from Yahoo Finance)
-        # We'll use earnings growth as a proxy
-        if earnings_growth is not None and earnings_growth > 0:
-            if earnings_growth >= analysis_config['min_earnings_growth']:
-                score += 33.33
+    def _calculate_value_score(self, metrics: Union[pd.Series, pd.DataFrame]) -> float:
+        """Calculate value score based on financial metrics."""
+        return float(value_score(self._metric_row(metrics), self._thresholds))
 
-        return min(score, max_score)
+    def _calculate_growth_score(self, metrics: Union[pd.Series, pd.DataFrame]) -> float:
+        """Calculate growth score based on financial metrics."""
+        return float(growth_score(self._metric_row(metrics), self._thresholds))
 
-    def _analyze_debt(self, metrics: pd.DataFrame) -> float:
+    def _analyze_debt(self, metrics: Union[pd.Series, pd.DataFrame]) -> float:
         """Analyze debt levels and return a score."""
         score = 0
         max_score = 100
-        analysis_config = self.config.get_analysis_config()
         
-        if metrics.empty:
+        row = self._first_row(metrics)
+        if row is None:
             return 0
             
-        debt_to_equity = metrics['debtToEquity'].iloc[0] if 'debtToEquity' in metrics else None
+        debt_to_equity = self._metric_value(row, 'debtToEquity')
         if debt_to_equity is not None and debt_to_equity > 0:
-            if debt_to_equity <= analysis_config['debt_to_equity_threshold']:
+            if debt_to_equity <= self.th.debt_to_equity_threshold:
                 score += 100
         
         return min(score, max_score)
 
-    def _analyze_profitability(self, metrics: pd.DataFrame) -> float:
+    def _analyze_profitability(self, metrics: Union[pd.Series, pd.DataFrame]) -> float:
         """Analyze profitability metrics and return a score."""
         score = 0
         max_score = 100
-        analysis_config = self.config.get_analysis_config()
         
-        if metrics.empty:
+        row = self._first_row(metrics)
+        if row is None:
             return 0
             
-        roe = metrics['returnOnEquity'].iloc[0] if 'returnOnEquity' in metrics else None
-        profit_margin = metrics['profitMargins'].iloc[0] if 'profitMargins' in metrics else None
+        roe = self._metric_value(row, 'returnOnEquity')
+        profit_margin = self._metric_value(row, 'profitMargins')
         
         if roe is not None and roe > 0:
-            if roe >= analysis_config['min_roe']:
+            if roe >= self.th.min_roe:
                 score += 50
                 
         if profit_margin is not None and profit_margin > 0:
-            if profit_margin >= analysis_config['min_profit_margin']:
+            if profit_margin >= self.th.min_profit_margin:
                 score += 50
         
         return min(score, max_score)
 
-    def _analyze_eps_growth(self, metrics: pd.DataFrame) -> float:
+    def _analyze_eps_growth(self, metrics: Union[pd.Series, pd.DataFrame]) -> float:
         """Analyze EPS growth and return a score."""
         score = 0
         max_score = 100
-        analysis_config = self.config.get_analysis_config()
         
-        if metrics.empty:
+        row = self._first_row(metrics)
+        if row is None:
             return 0
             
-        earnings_growth = metrics['earningsGrowth'].iloc[0] if 'earningsGrowth' in metrics else None
+        earnings_growth = self._metric_value(row, 'earningsGrowth')
         if earnings_growth is not None and earnings_growth > 0:
-            if earnings_growth >= analysis_config['min_earnings_growth']:
+            if earnings_growth >= self.th.min_earnings_growth:
                 score += 100
         
         return min(score, max_score) 
\ No newline at end of file
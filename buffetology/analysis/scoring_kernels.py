@@ -0,0 +1,141 @@
+"""Numeric scoring kernels shared by the Buffetology analyzer."""
+
+from dataclasses import astuple, dataclass, fields
+from typing import Any, Dict
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain NumPy
+    njit = None
+
+# Column order of the metric matrix passed to the kernels
+METRIC_ORDER = (
+    'debtToEquity', 'currentRatio', 'returnOnEquity', 'profitMargins', 'marketCap',
+    'trailingPE', 'priceToBook', 'pegRatio',
+    'revenueGrowth', 'earningsGrowth', 'freeCashflow'
+)
+
+# Metrics a ticker must report to be scored; the rest only add points when present
+REQUIRED_METRICS = METRIC_ORDER[:-1]
+
+@dataclass(frozen=True, slots=True)
+class Thresholds:
+    """Analysis thresholds: one per metric in METRIC_ORDER, then the ones the kernels don't use.
+
+    Field names match the keys of the analysis config. A threshold left
+    unset is NaN, and since NaN never compares true no ticker passes its
+    criterion, in the score kernels and the analyzer's screen alike.
+    """
+    debt_to_equity_threshold: float = float('nan')
+    min_current_ratio: float = float('nan')
+    min_roe: float = float('nan')
+    min_net_margin: float = float('nan')
+    min_market_cap: float = float('nan')
+    max_pe_ratio: float = float('nan')
+    max_pb_ratio: float = float('nan')
+    max_peg_ratio: float = float('nan')
+    min_revenue_growth: float = float('nan')
+    min_earnings_growth: float = float('nan')
+    # Positive free cash flow is required even when the config doesn't set a minimum
+    min_free_cashflow: float = 0.0
+    # Used by the analyzer's profitability check and screen, not by the score kernels
+    min_profit_margin: float = float('nan')
+    min_eps_growth: float = float('nan')
+
+    @classmethod
+    def from_config(cls, analysis_config: Dict[str, Any]) -> 'Thresholds':
+        """Build thresholds from the analysis section of the config."""
+        return cls(**{
+            field.name: float(analysis_config[field.name])
+            for field in fields(cls)
+            if analysis_config.get(field.name) is not None
+        })
+
+    def as_array(self) -> np.ndarray:
+        """Return the thresholds as a float array in METRIC_ORDER."""
+        return np.array(astuple(self)[:len(METRIC_ORDER)], dtype=np.float64)
+
+# True where the threshold is a maximum rather than a minimum
+UPPER_BOUND = np.array([
+    True, False, False, False, False,
+    True, True, True,
+    False, False, False
+])
+
+# Points each passing metric adds to the (quality, value, growth) scores
+WEIGHTS = np.array([
+    [20.0, 0.0, 0.0],    # debtToEquity
+    [20.0, 0.0, 0.0],    # currentRatio
+    [20.0, 0.0, 0.0],    # returnOnEquity
+    [20.0, 0.0, 0.0],    # profitMargins
+    [20.0, 25.0, 0.0],   # marketCap
+    [0.0, 25.0, 0.0],    # trailingPE
+    [0.0, 25.0, 0.0],    # priceToBook
+    [0.0, 25.0, 0.0],    # pegRatio
+    [0.0, 0.0, 33.33],   # revenueGrowth
+    [0.0, 0.0, 33.33],   # earningsGrowth
+    [0.0, 0.0, 33.33],   # freeCashflow
+])
+
+def _score_all_numpy(X: np.ndarray, thr: np.ndarray, upper: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Score every row of X with NumPy comparisons; NaN metrics never pass."""
+    with np.errstate(invalid='ignore'):
+        passed = (X > 0) & np.where(upper, X <= thr, X >= thr)
+    return passed @ weights
+
+def _score_all_loop(X, thr, upper, weights):
+    """Score every row of X with an explicit loop, compiled by numba."""
+    out = np.zeros((X.shape[0], weights.shape[1]))
+    for i in range(X.shape[0]):
+        for j in range(X.shape[1]):
+            x = X[i, j]
+            # NaN fails both comparisons, so missing metrics never score
+            if x > 0 and ((upper[j] and x <= thr[j]) or (not upper[j] and x >= thr[j])):
+                for k in range(weights.shape[1]):
+                    out[i, k] += weights[j, k]
+    return out
+
+def _score_one_loop(x, thr, upper, weights, k):
+    """Score a single metric row for score column k, compiled by numba."""
+    total = 0.0
+    for j in range(x.shape[0]):
+        v = x[j]
+        if v > 0 and ((upper[j] and v <= thr[j]) or (not upper[j] and v >= thr[j])):
+            total += weights[j, k]
+    return total
+
+if njit is not None:
+    _score_all_jit = njit(cache=True)(_score_all_loop)
+    _score_one_jit = njit(cache=True)(_score_one_loop)
+    # Compile once at import so the first analysis doesn't pay the JIT cost
+    _score_all_jit(np.zeros((1, len(METRIC_ORDER))), np.zeros(len(METRIC_ORDER)), UPPER_BOUND, WEIGHTS)
+    _score_one_jit(np.zeros(len(METRIC_ORDER)), np.zeros(len(METRIC_ORDER)), UPPER_BOUND, WEIGHTS, 0)
+else:
+    _score_all_jit = None
+    _score_one_jit = None
+
+def score_all(X: np.ndarray, thr: np.ndarray) -> np.ndarray:
+    """Return an (N, 3) array of quality, value and growth scores for an (N, 11) metric matrix."""
+    if _score_all_jit is not None:
+        return _score_all_jit(X, thr, UPPER_BOUND, WEIGHTS)
+    return _score_all_numpy(X, thr, UPPER_BOUND, WEIGHTS)
+
+def _score_one(x: np.ndarray, thr: np.ndarray, k: int) -> float:
+    """Return score column k for a single metric row."""
+    if _score_one_jit is not None:
+        return _score_one_jit(x, thr, UPPER_BOUND, WEIGHTS, k)
+    return float(_score_all_numpy(x.reshape(1, -1), thr, UPPER_BOUND, WEIGHTS[:, k:k + 1])[0, 0])
+
+def quality_score(x: np.ndarray, thr: np.ndarray) -> float:
+    """Return the quality score of a single metric row in METRIC_ORDER."""
+    return _score_one(x, thr, 0)
+
+def value_score(x: np.ndarray, thr: np.ndarray) -> float:
+    """Return the value score of a single metric row in METRIC_ORDER."""
+    return _score_one(x, thr, 1)
+
+def growth_score(x: np.ndarray, thr: np.ndarray) -> float:
+    """Return the growth score of a single metric row in METRIC_ORDER."""
+    return _score_one(x, thr, 2)
@@ -3,14 +3,11 @@ import yaml
 import sys
 from typing import Dict, Any, List, Optional
 from pathlib import Path
-from tabulate import tabulate
 import pandas as pd
 
 from buffetology.config.config_loader import ConfigLoader
 from buffetology.cache.cache_manager import CacheManager
 from buffetology.data_fetchers.yahoo_fetcher import YahooFinanceFetcher
-from buffetology.data_fetchers.fmp_fetcher import FMPFetcher
-from buffetology.data_fetchers.ft_fetcher import FinancialTimesFetcher
 from buffetology.analysis.buffetology_analyzer import BuffetologyAnalyzer
 
 class BuffetologyApp:
@@ -18,10 +15,7 @@ class BuffetologyApp:
         """Initialize the application with configuration."""
         self.config_loader = ConfigLoader(config_path)
         self.config = self.config_loader.config
-        self.cache_manager = CacheManager(
-            self.config['cache']['directory'],
-            self.config['cache']['expiry_days']
-        )
+        self.cache_manager = CacheManager.from_config(self.config['cache'])
         self.data_fetcher = self._initialize_data_fetcher()
         self.analyzer = BuffetologyAnalyzer(self.data_fetcher, self.config_loader)
 
@@ -41,7 +35,7 @@ class BuffetologyApp:
 
     def analyze_sp500(self, limit: Optional[int] = None) -> pd.DataFrame:
         """Analyze S&P 500 stocks and return results as a DataFrame."""
-        sp500_tickers = self.data_fetcher.get_sp500_tickers()
+        sp500_tickers = self.data_fetcher.get_sp500_tickers_cached()
         return self.analyze_stocks(sp500_tickers, limit)
 
     def run_analysis(self) -> None:
@@ -63,60 +57,59 @@ class BuffetologyApp:
 
     def _get_analysis_tickers(self) -> List[str]:
         """Get the list of tickers to analyze based on configuration."""
-        tickers = set()
+        # Insertion-ordered set, so runs analyze tickers in a stable order
+        tickers: Dict[str, None] = {}
         
         # Add custom tickers from config
         custom_tickers = self.config.get('analysis', {}).get('custom_tickers', [])
-        tickers.update(custom_tickers)
+        tickers.update(dict.fromkeys(custom_tickers))
         
         # Add top N SP500 tickers if configured
         sp500_top_n = self.config.get('analysis', {}).get('sp500_top_n', 0)
         if sp500_top_n > 0:
-            sp500_tickers = self.data_fetcher.get_sp500_tickers()
+            sp500_tickers = self.data_fetcher.get_sp500_tickers_cached()
             if sp500_tickers:  # Only add if we got some tickers
-                tickers.update(sp500_tickers[:sp500_top_n])
+                tickers.update(dict.fromkeys(sp500_tickers[:sp500_top_n]))
             else:
                 print("Warning: Failed to fetch S&P 500 tickers.")
         
         if not tickers:
             # Fallback to some default tickers if nothing else is available
-            tickers.update(['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META'])
+            tickers.update(dict.fromkeys(['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META']))
             print("Using default tickers as no other tickers were available.")
             
         return list(tickers)
 
     def _display_results(self, results_df) -> None:
-        """Display analysis results in a formatted table."""
+        """Display analysis results in the configured output format."""
         if results_df.empty:
             print("No results to display.")
             return
 
-        # Format the results table
-        table = tabulate(
-            results_df,
-            headers='keys',
-            tablefmt='pipe',
-            floatfmt=".2f",
-            showindex=False
-        )
-        
-        print("\nBuffetology Analysis Results:")
-        print("============================")
-        print(table)
+        # Write straight to stdout rather than building the whole table as one string
+        output_format = self.config.get('output', {}).get('format', 'table')
+        if output_format == 'csv':
+            results_df.to_csv(sys.stdout, index=False)
+        elif output_format == 'json':
+            results_df.to_json(sys.stdout, orient='records', indent=2)
+            sys.stdout.write("\n")
+        else:
+            print("\nBuffetology Analysis Results:")
+            print("============================")
+            print(results_df.to_string(index=False, float_format='%.2f'))
 
 def get_data_fetcher() -> YahooFinanceFetcher:
     """Get a data fetcher instance for standalone use."""
     config_loader = ConfigLoader()
     config = config_loader.config
-    cache_manager = CacheManager(
-        config['cache']['directory'],
-        config['cache']['expiry_days']
-    )
+    cache_manager = CacheManager.from_config(config['cache'])
     return YahooFinanceFetcher(cache_manager, config)
 
 def format_results(df: pd.DataFrame, output_format: str) -> str:
     """Format the results according to the specified output format."""
     if output_format == 'table':
+        # tabulate is an optional extra, so only grid output needs it
+        from tabulate import tabulate
         return tabulate(df, headers='keys', tablefmt='grid', showindex=False)
     elif output_format == 'csv':
         return df.to_csv(index=False)
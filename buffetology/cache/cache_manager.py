@@ -1,55 +1,312 @@
+import copy
+import io
 import os
 import json
-from datetime import datetime, timedelta
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; DataFrames are pickled without it
+    pa = None
+
+# Leading bytes identifying how a stored value was encoded
+_ARROW_MAGIC = b'ARROW1'
+_PARQUET_MAGIC = b'PAR1'
+_PICKLE_MAGIC = b'\x80'
+
+# pandas 3 always copies on write and deprecates the option that turned it on
+_PANDAS_3 = int(pd.__version__.split('.')[0]) >= 3
+
+# Key of the manifest entry listing the frames of a dict of DataFrames
+_FRAMES_KEY = '__frames__'
+
+# Types of the JSON values the fetchers cache, which are never DataFrames
+_PLAIN_TYPES = frozenset({dict, list, str, int, float, bool, type(None)})
+
+def _is_frame(value: Any) -> bool:
+    """Check whether a value is a DataFrame, deciding the common exact-type cases without isinstance."""
+    value_type = type(value)
+    if value_type is pd.DataFrame:
+        return True
+    return value_type not in _PLAIN_TYPES and isinstance(value, pd.DataFrame)
+
+def _dumps(value: Any) -> bytes:
+    """Serialize a cache value to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value).encode('utf-8')
+
+def _loads(data: bytes) -> Any:
+    """Deserialize JSON bytes written by _dumps."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _write_feather(frame: pd.DataFrame) -> bytes:
+    """Encode a DataFrame as Arrow IPC (Feather v2): fastest to read back."""
+    sink = pa.BufferOutputStream()
+    feather.write_feather(frame, sink, compression='lz4')
+    return sink.getvalue().to_pybytes()
+
+def _write_parquet(frame: pd.DataFrame) -> bytes:
+    """Encode a DataFrame as Parquet with ZSTD: smallest on disk."""
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, engine='pyarrow', compression='zstd', compression_level=3)
+    return buffer.getvalue()
+
+def _encode(value: Any, kind: Literal['hot', 'cold'] = 'hot') -> bytes:
+    """Encode a cache value: DataFrames as Feather (hot) or Parquet (cold), everything else as JSON."""
+    if _is_frame(value):
+        if pa is not None:
+            writers: Tuple[Callable[[pd.DataFrame], bytes], ...] = (
+                (_write_parquet, _write_feather) if kind == 'cold' else (_write_feather,)
+            )
+            for write in writers:
+                try:
+                    return write(value)
+                except (pa.ArrowException, TypeError, ValueError):
+                    continue  # e.g. non-string column labels, which Parquet rejects
+        return pickle.dumps(value, protocol=5)
+    return _dumps(value)
+
+def _to_pandas(table: 'pa.Table') -> pd.DataFrame:
+    """Convert a table read from the cache, which is discarded afterwards, without a consolidation copy."""
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def _decode(data: bytes) -> Any:
+    """Decode a value written by _encode, or by an older JSON-only cache."""
+    if data.startswith(_ARROW_MAGIC):
+        if pa is None:
+            raise ValueError("pyarrow is required to read a cached DataFrame")
+        return _to_pandas(feather.read_table(pa.BufferReader(data)))
+    if data.startswith(_PARQUET_MAGIC):
+        if pa is None:
+            raise ValueError("pyarrow is required to read a cached DataFrame")
+        return _to_pandas(pq.read_table(pa.BufferReader(data)))
+    if data.startswith(_PICKLE_MAGIC):
+        return pickle.loads(data)
+    return _loads(data)
+
+def _is_frame_dict(value: Any) -> bool:
+    """Check whether a value is a non-empty dict of DataFrames, e.g. a set of statements."""
+    return isinstance(value, dict) and bool(value) and all(
+        _is_frame(frame) for frame in value.values()
+    )
+
+def _copy_on_write() -> bool:
+    """Check whether pandas copies on write: always from pandas 3, opt-in before."""
+    return _PANDAS_3 or pd.options.mode.copy_on_write is True
+
+def _copy_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Copy a DataFrame so that in-place writes to either side don't reach the other."""
+    # Shallow copies are cheap and safe under copy-on-write; without it they share data
+    return frame.copy(deep=not _copy_on_write())
+
+def _detach(value: Any) -> Any:
+    """Return a value that doesn't share mutations with the one held in memory."""
+    if _is_frame(value):
+        return _copy_frame(value)
+    if _is_frame_dict(value):
+        return {name: _copy_frame(frame) for name, frame in value.items()}
+    if isinstance(value, (dict, list)):
+        # Like a value freshly decoded from the store, each reader gets its own JSON lists and dicts
+        return copy.deepcopy(value)
+    return value
 
 class CacheManager:
-    def __init__(self, cache_dir: str, expiry_days: int = 7):
+    def __init__(self, cache_dir: str, expiry_days: int = 7, memory_size: int = 4096):
         """Initialize the cache manager with directory and expiry settings."""
         self.cache_dir = Path(cache_dir)
         self.expiry_days = expiry_days
+        self.expiry_seconds = expiry_days * 86400.0
+        self.memory_size = memory_size
+        # Most recently used entries as key -> (mtime, value), in LRU order
+        self._mem: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        # One connection is shared by all threads, so serialize access to it
+        self._lock = threading.Lock()
         self._ensure_cache_dir()
+        self._conn = self._connect()
+        self._migrate_json_files()
+
+    @classmethod
+    def from_config(cls, cache_config: Dict[str, Any]) -> 'CacheManager':
+        """Build a cache manager from the cache section of the config."""
+        return cls(
+            cache_config['directory'],
+            cache_config['expiry_days'],
+            cache_config.get('memory_entries', 4096)
+        )
 
     def _ensure_cache_dir(self) -> None:
         """Ensure the cache directory exists."""
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
-    def _get_cache_path(self, key: str) -> Path:
-        """Get the path for a cache file."""
-        return self.cache_dir / f"{key}.json"
-
-    def _is_expired(self, cache_path: Path) -> bool:
-        """Check if a cache file is expired."""
-        if not cache_path.exists():
-            return True
-        mtime = datetime.fromtimestamp(cache_path.stat().st_mtime)
-        return datetime.now() - mtime > timedelta(days=self.expiry_days)
-
-    def get(self, key: str) -> Optional[Dict[str, Any]]:
-        """Get a value from the cache."""
-        cache_path = self._get_cache_path(key)
-        if not cache_path.exists() or self._is_expired(cache_path):
-            return None
+    def _connect(self) -> sqlite3.Connection:
+        """Open the SQLite store holding all cache entries."""
+        conn = sqlite3.connect(
+            self.cache_dir / 'cache.sqlite', isolation_level=None, check_same_thread=False
+        )
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS kv '
+            '(key TEXT PRIMARY KEY, mtime INTEGER NOT NULL, value BLOB NOT NULL)'
+        )
+        return conn
+
+    def _migrate_json_files(self) -> None:
+        """Move entries from the old one-file-per-key JSON layout into the store."""
+        # Runs on every start-up, so scan with os.scandir instead of Path.glob
         try:
-            with open(cache_path, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return None
+            with os.scandir(self.cache_dir) as entries:
+                legacy_files = [entry for entry in entries if entry.name.endswith('.json')]
+        except OSError:
+            return
+        if not legacy_files:
+            return
 
-    def set(self, key: str, value: Dict[str, Any]) -> None:
-        """Set a value in the cache."""
-        cache_path = self._get_cache_path(key)
+        rows = []
+        for entry in legacy_files:
+            try:
+                with open(entry.path, 'rb') as f:
+                    value = f.read()
+                _loads(value)
+                rows.append((entry.name[:-len('.json')], int(entry.stat().st_mtime), value))
+            except (json.JSONDecodeError, UnicodeDecodeError, OSError):
+                continue
+
+        self._conn.execute('BEGIN')
+        self._conn.executemany('INSERT OR IGNORE INTO kv (key, mtime, value) VALUES (?, ?, ?)', rows)
+        self._conn.execute('COMMIT')
         try:
-            with open(cache_path, 'w') as f:
-                json.dump(value, f)
-        except IOError:
+            for entry in legacy_files:
+                os.unlink(entry.path)
+        except OSError:
             pass
 
+    def _is_expired(self, mtime: float, max_age: Optional[float] = None) -> bool:
+        """Check if an entry written at mtime is expired, or older than max_age seconds."""
+        age = time.time() - mtime
+        return age > self.expiry_seconds or (max_age is not None and age > max_age)
+
+    def _remember(self, key: str, mtime: float, value: Any) -> None:
+        """Store an entry in the in-memory layer, evicting the least recently used.
+
+        Callers must hold self._lock.
+        """
+        self._mem[key] = (mtime, value)
+        self._mem.move_to_end(key)
+        if len(self._mem) > self.memory_size:
+            self._mem.popitem(last=False)
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """Get a value from the cache.
+
+        max_age (seconds) treats entries older than it as missing, for values that
+        go stale sooner than the cache's expiry_days.
+        """
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                if not self._is_expired(entry[0], max_age):
+                    self._mem.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return _detach(entry[1])
+                if self._is_expired(entry[0]):
+                    del self._mem[key]
+                else:
+                    # Fresh enough for other readers, just not this one
+                    self._stats['misses'] += 1
+                    return None
+
+            entry = self._read(key, max_age)
+            if entry is not None and type(entry[1]) is dict and _FRAMES_KEY in entry[1]:
+                entry = self._read_frames(key, entry[0], entry[1][_FRAMES_KEY])
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['disk_hits'] += 1
+            self._remember(key, entry[0], entry[1])
+            return _detach(entry[1])
+
+    def _read(self, key: str, max_age: Optional[float] = None) -> Optional[Tuple[float, Any]]:
+        """Read and decode an unexpired entry from the store as (mtime, value).
+
+        Callers must hold self._lock.
+        """
+        try:
+            row = self._conn.execute('SELECT value, mtime FROM kv WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or self._is_expired(row[1], max_age):
+            return None
+        try:
+            return row[1], _decode(row[0])
+        except Exception:
+            return None
+
+    def _read_frames(self, key: str, mtime: float, names: List[str]) -> Optional[Tuple[float, Dict[str, pd.DataFrame]]]:
+        """Read the frames listed in a dict-of-DataFrames manifest; None if any is missing.
+
+        Callers must hold self._lock.
+        """
+        frames = {}
+        for name in names:
+            entry = self._read(f"{key}__{name}")
+            if entry is None or not _is_frame(entry[1]):
+                return None
+            frames[name] = entry[1]
+        return mtime, frames
+
+    def set(self, key: str, value: Any, kind: Literal['hot', 'cold'] = 'hot') -> None:
+        """Set a value in the cache.
+
+        DataFrames that are read often (kind='hot') are stored as Feather;
+        large, long-lived ones (kind='cold') as compressed Parquet. A dict of
+        DataFrames stores each frame as its own entry, so no frame is
+        concatenated or re-encoded with the others.
+        """
+        mtime = int(time.time())
+        if _is_frame_dict(value):
+            rows = [(f"{key}__{name}", mtime, _encode(frame, kind)) for name, frame in value.items()]
+            rows.append((key, mtime, _dumps({_FRAMES_KEY: list(value)})))
+        else:
+            rows = [(key, mtime, _encode(value, kind))]
+        with self._lock:
+            self._remember(key, mtime, _detach(value))
+            try:
+                self._conn.execute('BEGIN')
+                self._conn.executemany('INSERT OR REPLACE INTO kv (key, mtime, value) VALUES (?, ?, ?)', rows)
+                self._conn.execute('COMMIT')
+            except sqlite3.Error:
+                if self._conn.in_transaction:
+                    self._conn.execute('ROLLBACK')
+
     def clear(self) -> None:
-        """Clear all cache files."""
-        for cache_file in self.cache_dir.glob('*.json'):
+        """Clear all cache entries."""
+        with self._lock:
+            self._mem.clear()
             try:
-                cache_file.unlink()
-            except IOError:
-                pass 
\ No newline at end of file
+                self._conn.execute('DELETE FROM kv')
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters for this process, plus the in-memory entry count."""
+        with self._lock:
+            return {**self._stats, 'memory_entries': len(self._mem)}
@@ -1,8 +1,42 @@
+import copy
+import functools
 import yaml
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Union
 import os
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+@functools.lru_cache(maxsize=16)
+def _load_yaml_cached(path: str, mtime: float) -> Any:
+    """Parse a YAML file; keyed on mtime so edits to the file are picked up."""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+def _load_yaml(path: str) -> Any:
+    """Load a YAML file, parsing each absolute path once per modification."""
+    path = os.path.abspath(path)
+    config = _load_yaml_cached(path, os.path.getmtime(path))
+    # Callers may mutate their config, so never hand out the cached object
+    return copy.deepcopy(config)
+
+# Fields each config section must define
+_SCHEMA = {
+    'data_provider': frozenset({'default'}),
+    'analysis': frozenset({
+        'sp500_top_n', 'min_eps_growth', 'min_revenue_growth',
+        'years_of_history', 'debt_to_equity_threshold',
+        'min_current_ratio', 'min_roe'
+    }),
+    'cache': frozenset({'enabled', 'directory', 'expiry_days'}),
+    'output': frozenset()
+}
+
+_PROVIDERS = frozenset({'yahoo', 'fmp', 'ft'})
+
 class ConfigLoader:
     def __init__(self, config_input: Optional[Union[str, Dict[str, Any]]] = None):
         """Initialize the configuration loader.
@@ -19,8 +53,7 @@ class ConfigLoader:
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from YAML file."""
         try:
-            with open(self.config_path, 'r') as f:
-                return yaml.safe_load(f)
+            return _load_yaml(self.config_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"Configuration file not found at {self.config_path}")
         except yaml.YAMLError as e:
@@ -34,8 +67,7 @@ class ConfigLoader:
             "config.yaml"
         )
         try:
-            with open(default_config_path, 'r') as f:
-                return yaml.safe_load(f)
+            return _load_yaml(default_config_path)
         except (FileNotFoundError, yaml.YAMLError):
             return {
                 'data_provider': {
@@ -67,36 +99,23 @@ class ConfigLoader:
         if not isinstance(self.config, dict):
             raise ValueError("Configuration must be a dictionary")
 
-        required_sections = ['data_provider', 'analysis', 'cache', 'output']
-        for section in required_sections:
+        for section, required_fields in _SCHEMA.items():
             if section not in self.config:
                 raise ValueError(f"Missing required section '{section}' in config")
+            values = self.config[section]
+            if values is None:
+                # A section left empty in YAML, like a bare 'output:', loads as None
+                values = self.config[section] = {}
+            if not isinstance(values, dict):
+                raise ValueError(f"Section '{section}' in config must be a mapping")
+            missing = required_fields - values.keys()
+            if missing:
+                raise ValueError(f"Missing required {section} fields {sorted(missing)} in config")
 
         # Validate data provider configuration
-        provider = self.config['data_provider']
-        if 'default' not in provider:
-            raise ValueError("Missing default data provider in config")
-        if provider['default'] not in ['yahoo', 'fmp', 'ft']:
+        if self.config['data_provider']['default'] not in _PROVIDERS:
             raise ValueError("Invalid default data provider specified")
 
-        # Validate analysis configuration
-        analysis = self.config['analysis']
-        required_analysis_fields = [
-            'sp500_top_n', 'min_eps_growth', 'min_revenue_growth',
-            'years_of_history', 'debt_to_equity_threshold',
-            'min_current_ratio', 'min_roe'
-        ]
-        for field in required_analysis_fields:
-            if field not in analysis:
-                raise ValueError(f"Missing required analysis field '{field}' in config")
-
-        # Validate cache configuration
-        cache = self.config['cache']
-        required_cache_fields = ['enabled', 'directory', 'expiry_days']
-        for field in required_cache_fields:
-            if field not in cache:
-                raise ValueError(f"Missing required cache field '{field}' in config")
-
     def get_data_provider_config(self) -> Dict[str, Any]:
         """Get data provider configuration."""
         return self.config['data_provider']
@@ -1,11 +1,91 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+import functools
+import threading
 import pandas as pd
-from datetime import datetime, timedelta
 import os
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import time
 import yaml
-from typing import Dict, List, Optional, Union, Any
+from datetime import timedelta
+from typing import Callable, Dict, List, Literal, Optional, Tuple, Union, Any
 from buffetology.config.config_loader import ConfigLoader
-from buffetology.cache.cache_manager import CacheManager
+from buffetology.cache.cache_manager import CacheManager, _detach
+
+try:
+    import requests_cache
+except ImportError:  # requests-cache is optional; responses are then never revalidated
+    requests_cache = None
+
+# How long a fetched S&P 500 constituent list is reused, in memory and on disk
+SP500_TTL_SECONDS = 24 * 60 * 60
+
+# (connect, read) timeout in seconds for HTTP requests made by the fetchers
+REQUEST_TIMEOUT = (3.05, 30)
+
+def _nonempty(frame: pd.DataFrame) -> bool:
+    """Check that a frame has rows and columns, reading its shape once instead of DataFrame.empty."""
+    rows, columns = frame.shape
+    return rows != 0 and columns != 0
+
+def create_pooled_session(cache_name: Optional[str] = None, expiry_days: float = 7) -> requests.Session:
+    """Create a session that keeps connections alive and retries transient errors.
+
+    With a cache_name and requests-cache installed, GET responses are kept in a
+    SQLite file and expired ones are revalidated with ETag/Last-Modified.
+    """
+    if cache_name is not None and requests_cache is not None:
+        session = requests_cache.CachedSession(
+            cache_name,
+            backend='sqlite',
+            expire_after=timedelta(days=expiry_days),
+            stale_if_error=True,
+            # Keep API keys out of the cache file and its request matching
+            ignored_parameters=['apikey']
+        )
+    else:
+        session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    )
+    session.mount("https://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip"})
+    return session
+
+def coalesce_calls(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Let concurrent calls with the same arguments share one in-flight fetch.
+
+    The first caller runs the method; callers arriving while it runs wait for
+    its result (or exception) instead of repeating the network requests.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            # Waiters get their own view of shared DataFrames, like cache hits do
+            return _detach(future.result())
+
+        try:
+            result = method(self, *args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+    return wrapper
 
 class BaseDataFetcher(ABC):
     def __init__(self, cache_manager: Optional[CacheManager] = None, config: Optional[Dict[str, Any]] = None):
@@ -16,49 +96,61 @@ class BaseDataFetcher(ABC):
             config: Optional configuration dictionary
         """
         self.config = config or ConfigLoader().config
-        self.cache_manager = cache_manager or CacheManager(
-            enabled=self.config['cache']['enabled'],
-            cache_dir=self.config['cache']['directory'],
-            expiry_days=self.config['cache']['expiry_days']
-        )
+        self.cache_manager = cache_manager or CacheManager.from_config(self.config['cache'])
+        self._sp500_cache: Optional[Tuple[float, List[str]]] = None
+        # Fetches currently running, for coalesce_calls
+        self._inflight: Dict[Tuple[Any, ...], Future] = {}
+        self._inflight_lock = threading.Lock()
         self._ensure_cache_directory()
     
     def _ensure_cache_directory(self):
         """Ensure the cache directory exists."""
         os.makedirs(self.config['cache']['directory'], exist_ok=True)
     
+    def _create_http_session(self) -> requests.Session:
+        """Create a pooled session whose responses are cached under the cache directory."""
+        cache_config = self.config['cache']
+        if not cache_config['enabled']:
+            return create_pooled_session()
+        return create_pooled_session(
+            os.path.join(cache_config['directory'], 'http'), cache_config['expiry_days']
+        )
+    
     def _get_cache_path(self, ticker: str, data_type: str) -> str:
         """Get the cache file path for a specific ticker and data type."""
         return os.path.join(self.config['cache']['directory'], f"{ticker}_{data_type}.csv")
     
-    def _is_cache_valid(self, cache_path: str) -> bool:
-        """Check if cached data is still valid."""
-        if not os.path.exists(cache_path):
-            return False
-        
-        cache_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_path))
-        return cache_age.days < self.config['cache']['expiry_days']
-    
-    def _load_from_cache(self, cache_key: str) -> Optional[Any]:
-        """Load data from cache if available and valid."""
+    def _load_from_cache(self, cache_key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """Load data from cache if available and valid; max_age (seconds) tightens the expiry."""
         if not self.config['cache']['enabled']:
             return None
             
         try:
-            return self.cache_manager.get(cache_key)
+            return self.cache_manager.get(cache_key, max_age=max_age)
         except Exception:
             return None
     
-    def _save_to_cache(self, cache_key: str, data: Any):
-        """Save data to cache."""
+    def _save_to_cache(self, cache_key: str, data: Any, kind: Literal['hot', 'cold'] = 'hot'):
+        """Save data to cache; kind='cold' stores large, long-lived frames compactly."""
         if not self.config['cache']['enabled']:
             return
             
         try:
-            self.cache_manager.set(cache_key, data)
+            self.cache_manager.set(cache_key, data, kind=kind)
         except Exception:
             pass
     
+    def _load_frames_from_cache(self, cache_key: str, names: Tuple[str, ...]) -> Optional[Dict[str, pd.DataFrame]]:
+        """Load a group of DataFrames cached by _save_frames_to_cache, or None if any is missing."""
+        frames = self._load_from_cache(cache_key)
+        if not isinstance(frames, dict) or not all(isinstance(frames.get(name), pd.DataFrame) for name in names):
+            return None
+        return frames
+
+    def _save_frames_to_cache(self, cache_key: str, frames: Dict[str, pd.DataFrame], kind: Literal['hot', 'cold'] = 'hot'):
+        """Save a group of DataFrames; the cache stores each frame as its own entry."""
+        self._save_to_cache(cache_key, frames, kind=kind)
+
     def _get_provider_config(self) -> Dict[str, Any]:
         """Get provider-specific configuration."""
         return self.config['data_provider']
@@ -73,6 +165,44 @@ class BaseDataFetcher(ABC):
         """Fetch key financial metrics"""
         pass
     
+    def get_key_metrics_bulk(self, tickers: List[str]) -> pd.DataFrame:
+        """Fetch key metrics for several tickers as one DataFrame indexed by ticker.
+
+        Tickers that fail to fetch are left out of the result; tickers that
+        return no data get an all-NaN row. Providers with a batch endpoint
+        should override this; the default overlaps per-ticker requests.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        fetched = self._map_concurrently(self._fetch_key_metrics_row, tickers)
+        frames = {ticker: metrics for ticker, metrics in zip(tickers, fetched) if metrics is not None}
+        return self._combine_key_metrics(frames)
+
+    def _map_concurrently(self, func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """Apply func to every item on a thread pool sized by analysis.fetch_workers."""
+        workers = self.config.get('analysis', {}).get('fetch_workers', 16)
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as executor:
+            return list(executor.map(func, items))
+
+    def _fetch_key_metrics_row(self, ticker: str) -> Optional[pd.DataFrame]:
+        """Fetch the first row of key metrics for a ticker, or None on failure."""
+        try:
+            return self.get_key_metrics(ticker).head(1)
+        except Exception as e:
+            print(f"Error fetching key metrics for {ticker}: {str(e)}")
+            return None
+
+    @staticmethod
+    def _combine_key_metrics(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Stack one-row metric frames into a single frame indexed by ticker."""
+        if not frames:
+            return pd.DataFrame()
+        combined = pd.concat(list(frames.values()), keys=list(frames.keys())).droplevel(1)
+        # Tickers whose frame was empty come back as NaN rows
+        combined = combined.reindex(list(frames.keys()))
+        # Stacking rows leaves the values row-major; rebuild column by column so that
+        # per-metric reductions scan contiguous memory
+        return pd.DataFrame(dict(combined.items()), index=combined.index)
+
     @abstractmethod
     def get_stock_price(self, ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
         """Fetch historical stock prices"""
@@ -81,4 +211,11 @@ class BaseDataFetcher(ABC):
     @abstractmethod
     def get_sp500_tickers(self, limit: int) -> List[str]:
         """Fetch list of S&P 500 tickers"""
-        pass 
\ No newline at end of file
+        pass
+
+    def get_sp500_tickers_cached(self, limit: Optional[int] = None) -> List[str]:
+        """Get S&P 500 tickers, reusing this process's last fetch for up to a day."""
+        if self._sp500_cache is None or time.time() - self._sp500_cache[0] > SP500_TTL_SECONDS:
+            self._sp500_cache = (time.time(), list(self.get_sp500_tickers(None)))
+        tickers = self._sp500_cache[1]
+        return tickers[:limit] if limit is not None else list(tickers)
\ No newline at end of file
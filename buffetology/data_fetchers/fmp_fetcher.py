@@ -1,49 +1,249 @@
-import requests
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import httpx
 import pandas as pd
-from typing import Dict, List
-from .base_fetcher import BaseDataFetcher
+from typing import Dict, List, Optional
+from buffetology.cache.cache_manager import CacheManager
+from buffetology.config.config_loader import ConfigLoader
+from .base_fetcher import REQUEST_TIMEOUT, BaseDataFetcher
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    _json_loads = json.loads
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional; key metrics are then plain float64
+    pa = None
+
+# Endpoint of each financial statement, keyed by the name it is returned under
+_STATEMENT_ENDPOINTS = {
+    "income": "income-statement",
+    "balance": "balance-sheet-statement",
+    "cashflow": "cash-flow-statement"
+}
+
+# Filing details shared by every statement endpoint
+_STATEMENT_HEADER_DTYPES = {
+    "date": "datetime64[ns]",
+    "symbol": "string",
+    "reportedCurrency": "string",
+    "cik": "string",
+    "fillingDate": "datetime64[ns]",
+    "acceptedDate": "datetime64[ns]",
+    "calendarYear": "string",
+    "period": "string"
+}
+
+def _statement_dtypes(fields: tuple) -> Dict[str, str]:
+    """Column dtypes of a statement: the filing header, numeric fields, then source links."""
+    # float64 rather than float32: amounts in the hundreds of billions need the precision
+    return {**_STATEMENT_HEADER_DTYPES, **dict.fromkeys(fields, "float64"), "link": "string", "finalLink": "string"}
+
+FMP_INCOME_DTYPES = _statement_dtypes((
+    "revenue", "costOfRevenue", "grossProfit", "grossProfitRatio",
+    "researchAndDevelopmentExpenses", "generalAndAdministrativeExpenses",
+    "sellingAndMarketingExpenses", "sellingGeneralAndAdministrativeExpenses",
+    "otherExpenses", "operatingExpenses", "costAndExpenses", "interestIncome",
+    "interestExpense", "depreciationAndAmortization", "ebitda", "ebitdaratio",
+    "operatingIncome", "operatingIncomeRatio", "totalOtherIncomeExpensesNet",
+    "incomeBeforeTax", "incomeBeforeTaxRatio", "incomeTaxExpense", "netIncome",
+    "netIncomeRatio", "eps", "epsdiluted", "weightedAverageShsOut", "weightedAverageShsOutDil"
+))
+
+FMP_BALANCE_DTYPES = _statement_dtypes((
+    "cashAndCashEquivalents", "shortTermInvestments", "cashAndShortTermInvestments",
+    "netReceivables", "inventory", "otherCurrentAssets", "totalCurrentAssets",
+    "propertyPlantEquipmentNet", "goodwill", "intangibleAssets", "goodwillAndIntangibleAssets",
+    "longTermInvestments", "taxAssets", "otherNonCurrentAssets", "totalNonCurrentAssets",
+    "otherAssets", "totalAssets", "accountPayables", "shortTermDebt", "taxPayables",
+    "deferredRevenue", "otherCurrentLiabilities", "totalCurrentLiabilities", "longTermDebt",
+    "deferredRevenueNonCurrent", "deferredTaxLiabilitiesNonCurrent", "otherNonCurrentLiabilities",
+    "totalNonCurrentLiabilities", "otherLiabilities", "capitalLeaseObligations", "totalLiabilities",
+    "preferredStock", "commonStock", "retainedEarnings", "accumulatedOtherComprehensiveIncomeLoss",
+    "othertotalStockholdersEquity", "totalStockholdersEquity", "totalEquity",
+    "totalLiabilitiesAndStockholdersEquity", "minorityInterest", "totalLiabilitiesAndTotalEquity",
+    "totalInvestments", "totalDebt", "netDebt"
+))
+
+FMP_CASHFLOW_DTYPES = _statement_dtypes((
+    "netIncome", "depreciationAndAmortization", "deferredIncomeTax", "stockBasedCompensation",
+    "changeInWorkingCapital", "accountsReceivables", "inventory", "accountsPayables",
+    "otherWorkingCapital", "otherNonCashItems", "netCashProvidedByOperatingActivities",
+    "investmentsInPropertyPlantAndEquipment", "acquisitionsNet", "purchasesOfInvestments",
+    "salesMaturitiesOfInvestments", "otherInvestingActivites", "netCashUsedForInvestingActivites",
+    "debtRepayment", "commonStockIssued", "commonStockRepurchased", "dividendsPaid",
+    "otherFinancingActivites", "netCashUsedProvidedByFinancingActivities",
+    "effectOfForexChangesOnCash", "netChangeInCash", "cashAtEndOfPeriod",
+    "cashAtBeginningOfPeriod", "operatingCashFlow", "capitalExpenditure", "freeCashFlow"
+))
+
+# Column dtypes of each financial statement, keyed like _STATEMENT_ENDPOINTS
+_STATEMENT_DTYPES = {
+    "income": FMP_INCOME_DTYPES,
+    "balance": FMP_BALANCE_DTYPES,
+    "cashflow": FMP_CASHFLOW_DTYPES
+}
+
+# Arrow schema of each statement: numeric fields as float64, everything else parsed as text
+_STATEMENT_SCHEMAS = {
+    name: pa.schema([
+        (column, pa.float64() if dtype == "float64" else pa.string()) for column, dtype in dtypes.items()
+    ])
+    for name, dtypes in _STATEMENT_DTYPES.items()
+} if pa is not None else {}
+
+def _statement_frame(name: str, records: List[Dict]) -> pd.DataFrame:
+    """Build a statement frame with declared column dtypes instead of inferring them."""
+    dtypes = _STATEMENT_DTYPES[name]
+    if pa is not None:
+        try:
+            # Arrow converts the records column by column in C++; only text columns are cast after.
+            # One block per column and freeing Arrow buffers as they convert avoids a consolidation copy.
+            table = pa.Table.from_pylist(records, schema=_STATEMENT_SCHEMAS[name])
+            frame = table.to_pandas(split_blocks=True, self_destruct=True)
+            return frame.astype({column: dtype for column, dtype in dtypes.items() if dtype != "float64"})
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass  # a field came back with an unexpected type; let pandas coerce it
+    return pd.DataFrame.from_records(records, columns=list(dtypes)).astype(dtypes)
+
+def _parse_financials(raw: Dict[str, List[Dict]]) -> Dict[str, pd.DataFrame]:
+    """Build the statement frames of one ticker from its raw JSON records, keyed by statement name."""
+    return {name: _statement_frame(name, raw[name]) for name in _STATEMENT_ENDPOINTS}
+
+# Batches smaller than this are parsed in-process; starting worker processes costs more
+_PROCESS_POOL_MIN_TICKERS = 8
+
+# Key metrics as (name used by the analyzer, FMP field) pairs
+_FMP_METRIC_MAP = (
+    ("marketCap", "marketCap"),
+    ("trailingPE", "peRatio"),
+    ("forwardPE", "forwardPE"),
+    ("pegRatio", "pegRatio"),
+    ("priceToBook", "pbRatio"),
+    ("debtToEquity", "debtToEquity"),
+    ("currentRatio", "currentRatio"),
+    ("returnOnEquity", "roe"),
+    ("returnOnAssets", "roa"),
+    ("profitMargins", "netProfitMargin"),
+    ("revenueGrowth", "revenueGrowth"),
+    ("earningsGrowth", "earningsGrowth")
+)
+
+_FMP_METRIC_SCHEMA = pa.schema([(metric, pa.float64()) for metric, _ in _FMP_METRIC_MAP]) if pa is not None else None
 
 class FMPFetcher(BaseDataFetcher):
-    def __init__(self, config_path: str = "buffetology/config/config.yaml"):
-        super().__init__(config_path)
+    def __init__(self, config_path: Optional[str] = None, cache_manager: Optional[CacheManager] = None):
+        super().__init__(cache_manager, ConfigLoader(config_path).config)
         self.api_key = self.config['data_provider']['fmp']['api_key']
         self.base_url = "https://financialmodelingprep.com/api/v3"
+        self.session = self._create_http_session()
     
-    def _make_request(self, endpoint: str) -> Dict:
-        url = f"{self.base_url}/{endpoint}?apikey={self.api_key}"
-        response = requests.get(url)
+    def _url(self, endpoint: str) -> str:
+        separator = "&" if "?" in endpoint else "?"
+        return f"{self.base_url}/{endpoint}{separator}apikey={self.api_key}"
+
+    def _make_request_json(self, endpoint: str) -> Dict:
+        response = self.session.get(self._url(endpoint), timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
+
+    def _make_request_df(self, endpoint: str, statement: str) -> pd.DataFrame:
+        return _statement_frame(statement, self._make_request_json(endpoint))
+
+    async def _make_request_async(self, client: httpx.AsyncClient, endpoint: str) -> Dict:
+        response = await client.get(self._url(endpoint))
+        response.raise_for_status()
+        return _json_loads(response.content)
     
     def get_financial_statements(self, ticker: str) -> Dict[str, pd.DataFrame]:
         cache_path = self._get_cache_path(ticker, "financial_statements")
-        cached_data = self._load_from_cache(cache_path)
+        cached_data = self._load_frames_from_cache(cache_path, tuple(_STATEMENT_ENDPOINTS))
         if cached_data is not None:
-            return {
-                "income": cached_data[cached_data['statement'] == 'income'],
-                "balance": cached_data[cached_data['statement'] == 'balance'],
-                "cashflow": cached_data[cached_data['statement'] == 'cashflow']
-            }
+            return cached_data
         
         # Fetch financial statements
-        income = pd.DataFrame(self._make_request(f"income-statement/{ticker}?limit=120"))
-        balance = pd.DataFrame(self._make_request(f"balance-sheet-statement/{ticker}?limit=120"))
-        cashflow = pd.DataFrame(self._make_request(f"cash-flow-statement/{ticker}?limit=120"))
-        
-        # Add statement type for caching
-        income['statement'] = 'income'
-        balance['statement'] = 'balance'
-        cashflow['statement'] = 'cashflow'
-        
-        # Combine for caching
-        combined = pd.concat([income, balance, cashflow])
-        self._save_to_cache(combined, cache_path)
-        
-        return {
-            "income": income,
-            "balance": balance,
-            "cashflow": cashflow
+        statements = {
+            name: self._make_request_df(f"{endpoint}/{ticker}?limit=120", name)
+            for name, endpoint in _STATEMENT_ENDPOINTS.items()
         }
+        self._save_frames_to_cache(cache_path, statements, kind='cold')
+        return statements
+
+    async def get_financial_statements_async(self, ticker: str, client: httpx.AsyncClient) -> Dict[str, pd.DataFrame]:
+        return _parse_financials(await self._fetch_statements_raw(ticker, client))
+
+    async def _fetch_statements_raw(self, ticker: str, client: httpx.AsyncClient) -> Dict[str, List[Dict]]:
+        """Fetch the raw JSON records of every statement of a ticker, keyed by statement name."""
+        records = await asyncio.gather(*(
+            self._make_request_async(client, f"{endpoint}/{ticker}?limit=120")
+            for endpoint in _STATEMENT_ENDPOINTS.values()
+        ))
+        return dict(zip(_STATEMENT_ENDPOINTS, records))
+
+    def fetch_many(self, tickers: List[str]) -> Dict[str, Dict[str, pd.DataFrame]]:
+        """Fetch financial statements for several tickers concurrently.
+
+        Tickers that fail to fetch are left out of the result.
+        """
+        return asyncio.run(self._fetch_many(list(dict.fromkeys(tickers))))
+
+    async def _fetch_many(self, tickers: List[str]) -> Dict[str, Dict[str, pd.DataFrame]]:
+        semaphore = asyncio.Semaphore(self.config.get('analysis', {}).get('fetch_workers', 16))
+
+        async def fetch(client: httpx.AsyncClient, ticker: str) -> Optional[Dict[str, List[Dict]]]:
+            async with semaphore:
+                try:
+                    return await self._fetch_statements_raw(ticker, client)
+                except Exception as e:
+                    print(f"Error fetching financial statements for {ticker}: {str(e)}")
+                    return None
+
+        # HTTP/2 multiplexes the concurrent requests over a few connections.
+        # The client is bound to the running loop, so it is created per call.
+        async with httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(30, connect=5),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+        ) as client:
+            results = await asyncio.gather(*(fetch(client, ticker) for ticker in tickers))
+
+        raw = {ticker: result for ticker, result in zip(tickers, results) if result is not None}
+        statements = {}
+        for ticker, result in zip(raw, await self._parse_many(list(raw.values()))):
+            if result is None:
+                print(f"Error parsing financial statements for {ticker}")
+                continue
+            self._save_frames_to_cache(self._get_cache_path(ticker, "financial_statements"), result, kind='cold')
+            statements[ticker] = result
+        return statements
+
+    async def _parse_many(self, raw: List[Dict[str, List[Dict]]]) -> List[Optional[Dict[str, pd.DataFrame]]]:
+        """Build statement frames for each ticker's raw records; None where parsing failed.
+
+        Parsing is CPU-bound and holds the GIL, so large batches are spread over
+        worker processes while the network stage stays on asyncio.
+        """
+        if len(raw) < _PROCESS_POOL_MIN_TICKERS:
+            parsed = []
+            for records in raw:
+                try:
+                    parsed.append(_parse_financials(records))
+                except Exception:
+                    parsed.append(None)
+            return parsed
+
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(raw))) as executor:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(executor, _parse_financials, records) for records in raw),
+                return_exceptions=True
+            )
+        return [None if isinstance(result, BaseException) else result for result in results]
     
     def get_key_metrics(self, ticker: str) -> pd.DataFrame:
         cache_path = self._get_cache_path(ticker, "key_metrics")
@@ -52,40 +252,17 @@ class FMPFetcher(BaseDataFetcher):
             return cached_data
         
         # Fetch key metrics
-        metrics_data = self._make_request(f"key-metrics/{ticker}?limit=1")[0]
+        metrics_data = self._make_request_json(f"key-metrics/{ticker}?limit=1")[0]
         
-        metrics = pd.DataFrame({
-            'metric': [
-                'market_cap',
-                'trailing_pe',
-                'forward_pe',
-                'peg_ratio',
-                'price_to_book',
-                'debt_to_equity',
-                'current_ratio',
-                'return_on_equity',
-                'return_on_assets',
-                'profit_margins',
-                'revenue_growth',
-                'earnings_growth'
-            ],
-            'value': [
-                metrics_data.get('marketCap', None),
-                metrics_data.get('peRatio', None),
-                metrics_data.get('forwardPE', None),
-                metrics_data.get('pegRatio', None),
-                metrics_data.get('pbRatio', None),
-                metrics_data.get('debtToEquity', None),
-                metrics_data.get('currentRatio', None),
-                metrics_data.get('roe', None),
-                metrics_data.get('roa', None),
-                metrics_data.get('netProfitMargin', None),
-                metrics_data.get('revenueGrowth', None),
-                metrics_data.get('earningsGrowth', None)
-            ]
-        })
+        row = {metric: metrics_data.get(field) for metric, field in _FMP_METRIC_MAP}
+        if _FMP_METRIC_SCHEMA is not None:
+            # Arrow-backed columns keep missing metrics as nulls without object boxing
+            table = pa.Table.from_pylist([row], schema=_FMP_METRIC_SCHEMA)
+            metrics = table.to_pandas(types_mapper=pd.ArrowDtype)
+        else:
+            metrics = pd.DataFrame([row]).astype("float64")
         
-        self._save_to_cache(metrics, cache_path)
+        self._save_to_cache(cache_path, metrics)
         return metrics
     
     def get_stock_price(self, ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
@@ -95,26 +272,26 @@ class FMPFetcher(BaseDataFetcher):
             return cached_data
         
         # Fetch historical price data
-        price_data = self._make_request(f"historical-price-full/{ticker}?from={start_date}&to={end_date}")
-        hist = pd.DataFrame(price_data['historical'])
+        price_data = self._make_request_json(f"historical-price-full/{ticker}?from={start_date}&to={end_date}")
+        hist = pd.DataFrame.from_records(price_data['historical'])
         hist['date'] = pd.to_datetime(hist['date'])
         hist.set_index('date', inplace=True)
         
-        self._save_to_cache(hist, cache_path)
+        self._save_to_cache(cache_path, hist, kind='cold')
         return hist
     
-    def get_sp500_tickers(self, limit: int) -> List[str]:
+    def get_sp500_tickers(self, limit: Optional[int] = None) -> List[str]:
         cache_path = self._get_cache_path("sp500", "tickers")
         cached_data = self._load_from_cache(cache_path)
         if cached_data is not None:
-            return cached_data['ticker'].head(limit).tolist()
+            return cached_data['ticker'].tolist()[:limit]
         
         # Fetch S&P 500 components
-        sp500_data = self._make_request("sp500_constituent")
+        sp500_data = self._make_request_json("sp500_constituent")
         tickers = [item['symbol'] for item in sp500_data]
         
         # Cache the results
         ticker_df = pd.DataFrame({'ticker': tickers})
-        self._save_to_cache(ticker_df, cache_path)
+        self._save_to_cache(cache_path, ticker_df)
         
         return tickers[:limit] 
\ No newline at end of file
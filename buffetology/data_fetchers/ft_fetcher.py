@@ -1,45 +1,50 @@
+from functools import cached_property
 import requests
 import pandas as pd
 from bs4 import BeautifulSoup
-from typing import Dict, List
-from .base_fetcher import BaseDataFetcher
+from typing import Dict, List, Optional
+from buffetology.cache.cache_manager import CacheManager
+from buffetology.config.config_loader import ConfigLoader
+from .base_fetcher import REQUEST_TIMEOUT, BaseDataFetcher
 
 class FinancialTimesFetcher(BaseDataFetcher):
-    def __init__(self, config_path: str = "buffetology/config/config.yaml"):
-        super().__init__(config_path)
+    def __init__(self, config_path: Optional[str] = None, cache_manager: Optional[CacheManager] = None):
+        super().__init__(cache_manager, ConfigLoader(config_path).config)
         self.username = self.config['data_provider']['financial_times']['username']
         self.password = self.config['data_provider']['financial_times']['password']
         self.base_url = "https://markets.ft.com"
-        self.session = self._create_session()
+    
+    @cached_property
+    def session(self) -> requests.Session:
+        # Log in on first use, so cache hits never touch the network
+        return self._create_session()
     
     def _create_session(self) -> requests.Session:
-        session = requests.Session()
+        session = self._create_http_session()
         login_url = f"{self.base_url}/login"
         login_data = {
             "username": self.username,
             "password": self.password
         }
-        response = session.post(login_url, data=login_data)
+        response = session.post(login_url, data=login_data, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return session
     
+    def _fetch_soup(self, url: str) -> BeautifulSoup:
+        response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        # Parse the raw bytes with the C-backed lxml parser; it detects the encoding itself
+        return BeautifulSoup(response.content, 'lxml')
+    
     def get_financial_statements(self, ticker: str) -> Dict[str, pd.DataFrame]:
         cache_path = self._get_cache_path(ticker, "financial_statements")
-        cached_data = self._load_from_cache(cache_path)
+        cached_data = self._load_frames_from_cache(cache_path, ("income", "balance", "cashflow"))
         if cached_data is not None:
-            return {
-                "income": cached_data[cached_data['statement'] == 'income'],
-                "balance": cached_data[cached_data['statement'] == 'balance'],
-                "cashflow": cached_data[cached_data['statement'] == 'cashflow']
-            }
+            return cached_data
         
         # Fetch financial statements from FT
         url = f"{self.base_url}/data/equities/tearsheet/financials?s={ticker}"
-        response = self.session.get(url)
-        response.raise_for_status()
-        
-        # Parse the HTML response
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._fetch_soup(url)
         
         # Extract financial data (this is a simplified example)
         # In a real implementation, you would need to parse the specific HTML structure
@@ -47,20 +52,13 @@ class FinancialTimesFetcher(BaseDataFetcher):
         balance = self._parse_financial_table(soup, "balance")
         cashflow = self._parse_financial_table(soup, "cashflow")
         
-        # Add statement type for caching
-        income['statement'] = 'income'
-        balance['statement'] = 'balance'
-        cashflow['statement'] = 'cashflow'
-        
-        # Combine for caching
-        combined = pd.concat([income, balance, cashflow])
-        self._save_to_cache(combined, cache_path)
-        
-        return {
+        statements = {
             "income": income,
             "balance": balance,
             "cashflow": cashflow
         }
+        self._save_frames_to_cache(cache_path, statements, kind='cold')
+        return statements
     
     def _parse_financial_table(self, soup: BeautifulSoup, statement_type: str) -> pd.DataFrame:
         # This is a placeholder implementation
@@ -76,16 +74,12 @@ class FinancialTimesFetcher(BaseDataFetcher):
         
         # Fetch key metrics from FT
         url = f"{self.base_url}/data/equities/tearsheet/summary?s={ticker}"
-        response = self.session.get(url)
-        response.raise_for_status()
-        
-        # Parse the HTML response
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._fetch_soup(url)
         
         # Extract key metrics (this is a simplified example)
         metrics = self._parse_key_metrics(soup)
         
-        self._save_to_cache(metrics, cache_path)
+        self._save_to_cache(cache_path, metrics)
         return metrics
     
     def _parse_key_metrics(self, soup: BeautifulSoup) -> pd.DataFrame:
@@ -102,16 +96,12 @@ class FinancialTimesFetcher(BaseDataFetcher):
         
         # Fetch historical price data from FT
         url = f"{self.base_url}/data/equities/tearsheet/historical?s={ticker}"
-        response = self.session.get(url)
-        response.raise_for_status()
-        
-        # Parse the HTML response
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._fetch_soup(url)
         
         # Extract historical prices (this is a simplified example)
         hist = self._parse_historical_prices(soup)
         
-        self._save_to_cache(hist, cache_path)
+        self._save_to_cache(cache_path, hist, kind='cold')
         return hist
     
     def _parse_historical_prices(self, soup: BeautifulSoup) -> pd.DataFrame:
@@ -120,26 +110,22 @@ class FinancialTimesFetcher(BaseDataFetcher):
         # of the Financial Times historical prices
         return pd.DataFrame()
     
-    def get_sp500_tickers(self, limit: int) -> List[str]:
+    def get_sp500_tickers(self, limit: Optional[int] = None) -> List[str]:
         cache_path = self._get_cache_path("sp500", "tickers")
         cached_data = self._load_from_cache(cache_path)
         if cached_data is not None:
-            return cached_data['ticker'].head(limit).tolist()
+            return cached_data['ticker'].tolist()[:limit]
         
         # Fetch S&P 500 components from FT
         url = f"{self.base_url}/data/indices/tearsheet/constituents?s=INX:IOM"
-        response = self.session.get(url)
-        response.raise_for_status()
-        
-        # Parse the HTML response
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = self._fetch_soup(url)
         
         # Extract tickers (this is a simplified example)
         tickers = self._parse_sp500_tickers(soup)
         
         # Cache the results
         ticker_df = pd.DataFrame({'ticker': tickers})
-        self._save_to_cache(ticker_df, cache_path)
+        self._save_to_cache(cache_path, ticker_df)
         
         return tickers[:limit]
     
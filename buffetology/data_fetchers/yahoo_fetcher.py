@@ -1,104 +1,267 @@
+import asyncio
+import random
+import functools
+from functools import cached_property
+import numpy as np
 import pandas as pd
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Literal, Optional, Dict, Any
 import yfinance as yf
-from buffetology.data_fetchers.base_fetcher import BaseDataFetcher
+from lxml import etree, html as lxml_html
+from yfinance.exceptions import YFRateLimitError
+from buffetology.data_fetchers.base_fetcher import (
+    REQUEST_TIMEOUT, SP500_TTL_SECONDS, BaseDataFetcher, _nonempty, coalesce_calls, create_pooled_session
+)
+
+try:
+    from curl_cffi import requests as curl_requests
+except ImportError:  # older yfinance releases use requests and bring no curl_cffi
+    curl_requests = None
+
+try:
+    from aiolimiter import AsyncLimiter
+except ImportError:  # aiolimiter is optional; get_many then relies on backoff alone
+    AsyncLimiter = None
+
+# Requests per second admitted by get_many (and so get_key_metrics_bulk), just under Yahoo's published limit
+_MAX_REQUESTS_PER_SECOND = 2.9
+# Attempts per symbol when Yahoo answers 429 Too Many Requests
+_RATE_LIMIT_ATTEMPTS = 5
+
+# Fields of yfinance's Ticker.info returned as key metrics
+_METRIC_FIELDS = (
+    'marketCap', 'forwardPE', 'trailingPE', 'priceToBook',
+    'returnOnEquity', 'returnOnAssets', 'currentRatio', 'debtToEquity',
+    'profitMargins', 'revenueGrowth', 'earningsGrowth', 'pegRatio',
+    'freeCashflow'
+)
+
+def _as_float(value: Any) -> float:
+    """Convert a yfinance info value to a float; missing or non-numeric values become NaN."""
+    try:
+        return np.nan if value is None else float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+# Source of the S&P 500 constituent list; the cache key names the source it was read from
+_SP500_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+_SP500_CACHE_KEY = "sp500_tickers_v1"
+# Wikipedia refuses requests without a descriptive User-Agent
+_SP500_USER_AGENT = "buffetology/0.1 (S&P 500 stock screener)"
+
+# Largest constituents, used when the list can't be fetched
+_SP500_FALLBACK = (
+    'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 'BRK-B', 'JNJ', 'V', 'PG', 'JPM',
+    'MA', 'HD', 'NVDA', 'BAC', 'PFE', 'DIS', 'KO', 'NFLX', 'PEP', 'MRK',
+    'ABBV', 'TMO', 'CSCO', 'WMT', 'MCD', 'ABT', 'CVX', 'VZ', 'ADBE', 'CRM',
+    'CMCSA', 'NKE', 'ACN', 'T', 'UNH', 'PYPL', 'INTC', 'IBM', 'ORCL', 'QCOM',
+    'INTU', 'AMGN', 'HON', 'TXN', 'AVGO', 'LOW', 'SBUX', 'GS', 'BA', 'CAT'
+)
+
+# Names financial statements are returned and cached under
+_STATEMENT_NAMES = ('income', 'balance', 'cash')
 
 class YahooFinanceFetcher(BaseDataFetcher):
+    # Symbol links in the first column of the constituents table, compiled once for every fetcher
+    _SP500_SYMBOLS = etree.XPath("//table[@id='constituents']//tr/td[1]/a/text()")
+
+    @cached_property
+    def _session(self) -> Optional[Any]:
+        """One browser-impersonating HTTP session shared by every yfinance call."""
+        # Yahoo blocks plain requests sessions, so use curl_cffi like yfinance does itself
+        return curl_requests.Session(impersonate="chrome") if curl_requests is not None else None
+
+    @cached_property
+    def _ticker(self) -> Callable[[str], yf.Ticker]:
+        """Get the yfinance Ticker for a symbol, reusing one object per symbol."""
+        # Held per fetcher rather than on the method, so the cache dies with the fetcher
+        return functools.lru_cache(maxsize=2048)(lambda symbol: yf.Ticker(symbol, session=self._session))
+
+    def get_many(self, symbols: List[str], kind: Literal['financials', 'metrics', 'prices'], **kwargs) -> Dict[str, Any]:
+        """Fetch one kind of data for several symbols concurrently.
+
+        kind picks the per-symbol method: 'financials' (get_financial_statements),
+        'metrics' (get_key_metrics) or 'prices' (get_stock_price, which needs
+        start_date and end_date). Symbols that fail are left out of the result.
+        """
+        return asyncio.run(self._get_many_async(list(dict.fromkeys(symbols)), kind, kwargs))
+
+    async def _get_many_async(self, symbols: List[str], kind: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        fetch = {
+            'financials': self.get_financial_statements,
+            'metrics': self.get_key_metrics,
+            'prices': self.get_stock_price
+        }[kind]
+        semaphore = asyncio.Semaphore(self.config.get('analysis', {}).get('fetch_workers', 16))
+        # Limiters are bound to the event loop they first run on, so one is made per call
+        limiter = AsyncLimiter(_MAX_REQUESTS_PER_SECOND, 1) if AsyncLimiter is not None else None
+
+        async def fetch_one(symbol: str) -> Any:
+            async with semaphore:
+                for attempt in range(_RATE_LIMIT_ATTEMPTS):
+                    try:
+                        if limiter is not None:
+                            await limiter.acquire()
+                        # yfinance is blocking and manages Yahoo's cookie/crumb handshake itself
+                        return await asyncio.to_thread(fetch, symbol, **kwargs)
+                    except Exception as e:
+                        if self._is_rate_limited(e) and attempt + 1 < _RATE_LIMIT_ATTEMPTS:
+                            await asyncio.sleep(2 ** attempt + random.random())
+                            continue
+                        print(f"Error fetching {kind} for {symbol}: {str(e)}")
+                        return None
+
+        results = await asyncio.gather(*(fetch_one(symbol) for symbol in symbols))
+        return {symbol: result for symbol, result in zip(symbols, results) if result is not None}
+
+    @staticmethod
+    def _is_rate_limited(error: Exception) -> bool:
+        """Check whether an error, or the yfinance error it wraps, is a 429."""
+        return isinstance(error, YFRateLimitError) or isinstance(error.__context__, YFRateLimitError)
+
+    @coalesce_calls
     def get_financial_statements(self, ticker: str) -> Dict[str, pd.DataFrame]:
         """Get financial statements for a ticker."""
         cache_key = f"{ticker}_financials"
-        cached_data = self._load_from_cache(cache_key)
+        cached_data = self._load_frames_from_cache(cache_key, _STATEMENT_NAMES)
         if cached_data is not None:
-            return {
-                'income': pd.DataFrame(cached_data.get('income', {})),
-                'balance': pd.DataFrame(cached_data.get('balance', {})),
-                'cash': pd.DataFrame(cached_data.get('cash', {}))
-            }
+            return cached_data
 
         try:
-            stock = yf.Ticker(ticker)
+            stock = self._ticker(ticker)
             data = {
                 'income': stock.financials,
                 'balance': stock.balance_sheet,
                 'cash': stock.cashflow
             }
-            self._save_to_cache(cache_key, {
-                'income': data['income'].to_dict(),
-                'balance': data['balance'].to_dict(),
-                'cash': data['cash'].to_dict()
-            })
+            self._save_frames_to_cache(cache_key, data, kind='cold')
             return data
         except Exception as e:
             raise ValueError(f"Failed to fetch financial statements for {ticker}: {str(e)}")
 
+    @coalesce_calls
     def get_key_metrics(self, ticker: str) -> pd.DataFrame:
         """Get key metrics for a ticker."""
         cache_key = f"{ticker}_metrics"
         cached_data = self._load_from_cache(cache_key)
         if cached_data is not None:
-            return pd.DataFrame([cached_data])
+            return self._metrics_frame([cached_data])
 
         try:
-            stock = yf.Ticker(ticker)
-            metrics = {
-                'marketCap': stock.info.get('marketCap'),
-                'forwardPE': stock.info.get('forwardPE'),
-                'trailingPE': stock.info.get('trailingPE'),
-                'priceToBook': stock.info.get('priceToBook'),
-                'returnOnEquity': stock.info.get('returnOnEquity'),
-                'returnOnAssets': stock.info.get('returnOnAssets'),
-                'currentRatio': stock.info.get('currentRatio'),
-                'debtToEquity': stock.info.get('debtToEquity'),
-                'profitMargins': stock.info.get('profitMargins'),
-                'revenueGrowth': stock.info.get('revenueGrowth'),
-                'earningsGrowth': stock.info.get('earningsGrowth'),
-                'pegRatio': stock.info.get('pegRatio')
-            }
+            stock = self._ticker(ticker)
+            metrics = self._metrics_from_info(stock.info)
             self._save_to_cache(cache_key, metrics)
-            return pd.DataFrame([metrics])
+            return self._metrics_frame([metrics])
         except Exception as e:
             raise ValueError(f"Failed to fetch key metrics for {ticker}: {str(e)}")
 
+    def get_key_metrics_bulk(self, tickers: List[str]) -> pd.DataFrame:
+        """Get key metrics for several tickers, fetching uncached ones through get_many's rate limiter."""
+        tickers = list(dict.fromkeys(tickers))
+        rows = {}
+        missing = []
+        for ticker in tickers:
+            cached_data = self._load_from_cache(f"{ticker}_metrics")
+            if cached_data is not None:
+                rows[ticker] = cached_data
+            else:
+                missing.append(ticker)
+
+        if missing:
+            # get_key_metrics caches what it fetches; 429s are retried with backoff
+            for ticker, metrics in self.get_many(missing, kind='metrics').items():
+                rows[ticker] = metrics.iloc[0].to_dict()
+
+        fetched = [ticker for ticker in tickers if ticker in rows]
+        return self._metrics_frame([rows[ticker] for ticker in fetched], index=fetched)
+
+    @staticmethod
+    def _metrics_from_info(info: Dict[str, Any]) -> Dict[str, Any]:
+        """Pick the key metrics out of a yfinance info dict."""
+        return {field: info.get(field) for field in _METRIC_FIELDS}
+
+    @staticmethod
+    def _metrics_frame(rows: List[Dict[str, Any]], index: Optional[List[str]] = None) -> pd.DataFrame:
+        """Build a float64 metrics frame, one row per metrics dict, stored column by column."""
+        # A dict of 1-D arrays keeps each metric contiguous, unlike a list of row dicts
+        return pd.DataFrame({
+            field: np.fromiter((_as_float(row.get(field)) for row in rows), dtype=np.float64, count=len(rows))
+            for field in _METRIC_FIELDS
+        }, index=index)
+
     def get_sp500_tickers(self, limit: Optional[int] = None) -> List[str]:
-        """Get S&P 500 tickers."""
-        cache_key = "sp500_tickers"
-        cached_data = self._load_from_cache(cache_key)
-        if cached_data is not None:
-            tickers = cached_data if isinstance(cached_data, list) else []
-        else:
+        """Get S&P 500 tickers, refetching the constituent list at most once a day."""
+        tickers = self._load_from_cache(_SP500_CACHE_KEY, max_age=SP500_TTL_SECONDS)
+        if not isinstance(tickers, list):
             try:
-                # Use the S&P 500 ETF (SPY) to get components
-                spy = yf.Ticker('SPY')
-                tickers = spy.info.get('components', [])
-                if not tickers:  # Fallback to a more comprehensive list
-                    tickers = [
-                        'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 'BRK-B', 'JNJ', 'V', 'PG', 'JPM',
-                        'MA', 'HD', 'NVDA', 'BAC', 'PFE', 'DIS', 'KO', 'NFLX', 'PEP', 'MRK',
-                        'ABBV', 'TMO', 'CSCO', 'WMT', 'MCD', 'ABT', 'CVX', 'VZ', 'ADBE', 'CRM',
-                        'CMCSA', 'NKE', 'ACN', 'T', 'UNH', 'PYPL', 'INTC', 'IBM', 'ORCL', 'QCOM',
-                        'INTU', 'AMGN', 'HON', 'TXN', 'AVGO', 'LOW', 'SBUX', 'GS', 'BA', 'CAT'
-                    ]
-                self._save_to_cache(cache_key, tickers)
+                tickers = self._fetch_sp500_components()
             except Exception as e:
-                raise ValueError(f"Failed to fetch S&P 500 tickers: {str(e)}")
+                print(f"Error fetching S&P 500 constituents: {str(e)}")
+                tickers = list(_SP500_FALLBACK)
+            else:
+                self._save_to_cache(_SP500_CACHE_KEY, tickers)
 
         if limit and isinstance(limit, int):
             tickers = tickers[:limit]
         return tickers
 
+    def _fetch_sp500_components(self) -> List[str]:
+        """Read the S&P 500 constituents table from Wikipedia, with symbols in Yahoo's notation."""
+        # A plain session: the HTTP response cache would keep the page past the one-day TTL
+        with create_pooled_session() as session:
+            response = session.get(_SP500_URL, headers={"User-Agent": _SP500_USER_AGENT}, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+        symbols = self._SP500_SYMBOLS(lxml_html.fromstring(response.content))
+        if not symbols:
+            raise ValueError("S&P 500 constituents table not found")
+        # Yahoo writes share classes with a dash, e.g. BRK-B rather than BRK.B
+        return [str(symbol).strip().replace(".", "-") for symbol in symbols]
+
+    @coalesce_calls
     def get_stock_price(self, ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
-        """Get stock price data for a ticker."""
-        cache_key = f"{ticker}_price_{start_date}_{end_date}"
-        cached_data = self._load_from_cache(cache_key)
-        if cached_data is not None:
-            return pd.DataFrame(cached_data)
+        """Get stock price data for a ticker.
 
-        try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(start=start_date, end=end_date)
-            if data.empty:
-                return pd.DataFrame(columns=['Close', 'Open', 'High', 'Low'])
-            self._save_to_cache(cache_key, data.to_dict())
-            return data
-        except Exception as e:
-            raise ValueError(f"Failed to fetch stock price for {ticker}: {str(e)}")
\ No newline at end of file
+        Raises ValueError when the download itself fails. yf.download reports a
+        symbol it couldn't fetch the same way as one with no prices in the range,
+        so both return an empty Close/Open/High/Low frame.
+        """
+        return self.get_stock_prices_batch([ticker], start_date, end_date)[ticker]
+
+    def get_stock_prices(self, symbols: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+        """Get stock price data for several tickers as one frame with (ticker, field) columns."""
+        prices = self.get_stock_prices_batch(symbols, start_date, end_date)
+        return pd.concat(prices, axis=1) if prices else pd.DataFrame()
+
+    def get_stock_prices_batch(self, tickers: List[str], start_date: str, end_date: str) -> Dict[str, pd.DataFrame]:
+        """Get stock price data for several tickers with one yfinance download."""
+        tickers = list(dict.fromkeys(tickers))
+        prices = {}
+        missing = []
+        for ticker in tickers:
+            cached_data = self._load_from_cache(f"{ticker}_price_{start_date}_{end_date}")
+            if cached_data is not None:
+                prices[ticker] = cached_data
+            else:
+                missing.append(ticker)
+
+        if missing:
+            try:
+                data = yf.download(
+                    missing, start=start_date, end=end_date,
+                    group_by='ticker', threads=True, progress=False, session=self._session
+                )
+            except Exception as e:
+                raise ValueError(f"Failed to fetch stock prices for {', '.join(missing)}: {str(e)}")
+
+            downloaded = set(data.columns.get_level_values(0)) if isinstance(data.columns, pd.MultiIndex) else set()
+            for ticker in missing:
+                # yfinance upper-cases symbols in its result; results stay keyed as the caller spelled them
+                symbol = ticker.upper()
+                # Tickers that failed to download come back as all-NaN rows, if at all
+                hist = data[symbol].dropna(how='all') if symbol in downloaded else pd.DataFrame()
+                if not _nonempty(hist):
+                    prices[ticker] = pd.DataFrame(columns=['Close', 'Open', 'High', 'Low'])
+                    continue
+                self._save_to_cache(f"{ticker}_price_{start_date}_{end_date}", hist, kind='cold')
+                prices[ticker] = hist
+
+        return {ticker: prices[ticker] for ticker in tickers}
\ No newline at end of file
@@ -0,0 +1,48 @@
+from typing import Dict
+from unittest.mock import Mock
+import pytest
+import yfinance as yf
+from buffetology.tests import fakes
+from buffetology.tests.fakes import FakeTicker
+
+
+@pytest.fixture(scope='session')
+def annual_dates():
+    """Year-end dates of three fiscal years, fixed so results don't depend on today's date."""
+    return fakes.annual_dates()
+
+
+@pytest.fixture
+def mock_cache_manager():
+    """Create a mock cache manager that always misses."""
+    cache_manager = Mock()
+    cache_manager.get.return_value = None
+    return cache_manager
+
+
+@pytest.fixture
+def tmp_cwd(tmp_path, monkeypatch):
+    """Run the test from a temporary directory.
+
+    The default config keeps its cache directory relative to the working directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def patch_yf(monkeypatch):
+    """Serve yfinance.Ticker from a registry of FakeTickers; tests add them by symbol.
+
+    Unregistered symbols raise, like yfinance does for unknown tickers.
+    """
+    registry: Dict[str, FakeTicker] = {}
+
+    def ticker(symbol: str, session=None) -> FakeTicker:
+        try:
+            return registry[symbol]
+        except KeyError:
+            raise ValueError(f"No data found for {symbol}") from None
+
+    monkeypatch.setattr(yf, 'Ticker', ticker)
+    return registry
@@ -0,0 +1,23 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict
+import pandas as pd
+
+
+@dataclass
+class FakeTicker:
+    """Stand-in for yfinance.Ticker holding canned data for one symbol."""
+    symbol: str
+    info: Dict[str, Any] = field(default_factory=dict)
+    financials: pd.DataFrame = field(default_factory=pd.DataFrame)
+    balance_sheet: pd.DataFrame = field(default_factory=pd.DataFrame)
+    cashflow: pd.DataFrame = field(default_factory=pd.DataFrame)
+    prices: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+    def history(self, start=None, end=None, **kwargs) -> pd.DataFrame:
+        """Return the canned price history, whatever the requested range."""
+        return self.prices
+
+
+def annual_dates() -> pd.DatetimeIndex:
+    """Year-end dates of three fiscal years, fixed so results don't depend on today's date."""
+    return pd.date_range(end=pd.Timestamp(2024, 1, 1), periods=3, freq='YE')
@@ -0,0 +1,75 @@
+import pytest
+import json
+import yaml
+import pandas as pd
+from unittest.mock import patch
+from buffetology.app import BuffetologyApp, format_results
+from buffetology.config.config_loader import ConfigLoader
+
+_RESULTS = pd.DataFrame({
+    'ticker': ['AAPL', 'MSFT'],
+    'overall_score': [81.234, 55.5],
+    'recommendation': ['Buy', 'Hold']
+})
+
+@pytest.fixture
+def app(tmp_path):
+    """Create an app from the shipped config, caching under a temporary directory."""
+    config = ConfigLoader().config
+    config['cache']['directory'] = str(tmp_path / "cache")
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(yaml.safe_dump(config))
+    return BuffetologyApp(str(config_file))
+
+def test_get_analysis_tickers_deduplicates_in_order(app):
+    """Test that custom and S&P 500 tickers are merged without duplicates, keeping first-seen order."""
+    app.config['analysis']['custom_tickers'] = ['MSFT', 'AAPL', 'MSFT']
+    app.config['analysis']['sp500_top_n'] = 3
+    with patch.object(app.data_fetcher, 'get_sp500_tickers_cached', return_value=['AAPL', 'GOOGL', 'AMZN', 'META']):
+        assert app._get_analysis_tickers() == ['MSFT', 'AAPL', 'GOOGL', 'AMZN']
+
+def test_display_results_csv(app, capsys):
+    """Test that csv output is written to stdout as-is."""
+    app.config['output']['format'] = 'csv'
+    app._display_results(_RESULTS)
+    assert capsys.readouterr().out == (
+        "ticker,overall_score,recommendation\n"
+        "AAPL,81.234,Buy\n"
+        "MSFT,55.5,Hold\n"
+    )
+
+def test_display_results_json(app, capsys):
+    """Test that json output is one record per row followed by a newline."""
+    app.config['output']['format'] = 'json'
+    app._display_results(_RESULTS)
+    out = capsys.readouterr().out
+    assert out.endswith("}\n]\n")
+    assert json.loads(out) == _RESULTS.to_dict(orient='records')
+
+def test_display_results_table(app, capsys):
+    """Test that table output has a heading and two-decimal scores without the index."""
+    app.config['output']['format'] = 'table'
+    app._display_results(_RESULTS)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1] == "Buffetology Analysis Results:"
+    assert lines[3].split() == ['ticker', 'overall_score', 'recommendation']
+    assert lines[4].split() == ['AAPL', '81.23', 'Buy']
+
+def test_display_results_empty(app, capsys):
+    """Test that an empty result set prints a notice instead of a table."""
+    app._display_results(pd.DataFrame())
+    assert capsys.readouterr().out == "No results to display.\n"
+
+def test_format_results():
+    """Test formatting results as strings in each supported format."""
+    assert format_results(_RESULTS, 'csv').splitlines()[1] == "AAPL,81.234,Buy"
+    assert json.loads(format_results(_RESULTS, 'json'))[1]['ticker'] == 'MSFT'
+    with pytest.raises(ValueError):
+        format_results(_RESULTS, 'xml')
+
+def test_format_results_table():
+    """Test that table output is a tabulate grid."""
+    pytest.importorskip('tabulate')
+    table = format_results(_RESULTS, 'table')
+    assert table.startswith("+")
+    assert "| AAPL" in table
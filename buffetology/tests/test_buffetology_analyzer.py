@@ -1,14 +1,55 @@
 import pytest
+import dataclasses
 from unittest.mock import Mock, patch
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from typing import Dict
 
+from buffetology.analysis import scoring_kernels
 from buffetology.analysis.buffetology_analyzer import BuffetologyAnalyzer
 from buffetology.data_fetchers.yahoo_fetcher import YahooFinanceFetcher
 from buffetology.config.config_loader import ConfigLoader
 
-@pytest.fixture
+# Fetcher data shared by every test; tests replace return values, never mutate these
+_DATES = pd.date_range(end=datetime(2024, 1, 1), periods=4, freq='QE')
+
+_FINANCIALS = {
+    'income': pd.DataFrame({
+        'Revenue': [100, 120, 144, 173],
+        'Net Income': [20, 25, 31, 38]
+    }, index=_DATES),
+    'balance': pd.DataFrame({
+        'Total Assets': [200, 220, 240, 264],
+        'Total Liabilities': [60, 65, 70, 77],
+        'Total Debt': [40, 42, 45, 50],
+        'Current Assets': [100, 110, 120, 132],
+        'Current Liabilities': [40, 42, 45, 50]
+    }, index=_DATES),
+    'cash': pd.DataFrame({
+        'Operating Cash Flow': [30, 35, 40, 46],
+        'Free Cash Flow': [25, 29, 34, 39]
+    }, index=_DATES)
+}
+
+_METRICS = pd.DataFrame([{
+    'debtToEquity': 0.3,
+    'currentRatio': 2.5,
+    'returnOnEquity': 0.25,
+    'profitMargins': 0.2,
+    'priceToBook': 2.0,
+    'trailingPE': 15.0,
+    'pegRatio': 1.2,
+    'marketCap': 1000000000,
+    'revenueGrowth': 0.2,
+    'earningsGrowth': 0.25
+}])
+
+_PRICE = pd.DataFrame({
+    'Close': [100, 105, 110, 115]
+}, index=_DATES)
+
+@pytest.fixture(scope='session')
 def mock_config():
     """Create a mock configuration for testing."""
     return {
@@ -44,7 +85,7 @@ def mock_config():
         }
     }
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def config(mock_config):
     """Load the mock configuration."""
     return ConfigLoader(mock_config)
@@ -54,49 +95,15 @@ def mock_data_fetcher():
     """Create a mock data fetcher for testing."""
     fetcher = Mock(spec=YahooFinanceFetcher)
     
-    # Mock financial statements
-    dates = pd.date_range(end=datetime.now(), periods=4, freq='QE')
-    financials = {
-        'income': pd.DataFrame({
-            'Revenue': [100, 120, 144, 173],
-            'Net Income': [20, 25, 31, 38]
-        }, index=dates),
-        'balance': pd.DataFrame({
-            'Total Assets': [200, 220, 240, 264],
-            'Total Liabilities': [60, 65, 70, 77],
-            'Total Debt': [40, 42, 45, 50],
-            'Current Assets': [100, 110, 120, 132],
-            'Current Liabilities': [40, 42, 45, 50]
-        }, index=dates),
-        'cash': pd.DataFrame({
-            'Operating Cash Flow': [30, 35, 40, 46],
-            'Free Cash Flow': [25, 29, 34, 39]
-        }, index=dates)
-    }
-    
-    # Mock key metrics
-    metrics = pd.DataFrame([{
-        'debtToEquity': 0.3,
-        'currentRatio': 2.5,
-        'returnOnEquity': 0.25,
-        'profitMargins': 0.2,
-        'priceToBook': 2.0,
-        'trailingPE': 15.0,
-        'pegRatio': 1.2,
-        'marketCap': 1000000000,
-        'revenueGrowth': 0.2,
-        'earningsGrowth': 0.25
-    }])
-    
-    # Mock stock price
-    price_data = pd.DataFrame({
-        'Close': [100, 105, 110, 115]
-    }, index=dates)
-    
-    fetcher.get_financial_statements.return_value = financials
-    fetcher.get_key_metrics.return_value = metrics
-    fetcher.get_stock_price.return_value = price_data
+    fetcher.get_financial_statements.return_value = _FINANCIALS
+    fetcher.get_key_metrics.return_value = _METRICS
+    # The bulk call mirrors get_key_metrics so tests can keep overriding that
+    fetcher.get_key_metrics_bulk.side_effect = lambda tickers: pd.concat(
+        [fetcher.get_key_metrics(ticker) for ticker in tickers], keys=tickers
+    ).droplevel(1)
+    fetcher.get_stock_price.return_value = _PRICE
     fetcher.get_sp500_tickers.return_value = ['AAPL', 'MSFT', 'GOOGL']
+    fetcher.get_sp500_tickers_cached.return_value = ['AAPL', 'MSFT', 'GOOGL']
     
     return fetcher
 
@@ -197,6 +204,12 @@ def test_analyze_multiple_stocks(analyzer):
     assert len(results) == 3
     assert all(col in results.columns for col in ['ticker', 'overall_score', 'recommendation'])
 
+def test_analyze_stocks_dtypes(analyzer):
+    """Test that batch results use the declared column dtypes."""
+    results = analyzer.analyze_stocks(['AAPL', 'MSFT'])
+    assert results['overall_score'].dtype == 'float32'
+    assert isinstance(results['recommendation'].dtype, pd.CategoricalDtype)
+
 def test_calculate_debt_ratio(analyzer):
     """Test debt ratio calculation."""
     metrics = pd.DataFrame([{
@@ -275,4 +288,95 @@ def test_analyze_sp500(analyzer):
     results = analyzer.analyze_sp500()
     assert isinstance(results, pd.DataFrame)
     assert len(results) > 0
-    assert all(col in results.columns for col in ['ticker', 'overall_score', 'recommendation']) 
\ No newline at end of file
+    assert all(col in results.columns for col in ['ticker', 'overall_score', 'recommendation']) 
+
+def test_growth_score_counts_each_criterion_once(analyzer):
+    """Test earnings growth is not double counted and free cash flow adds the third third."""
+    metrics = analyzer.data_fetcher.get_key_metrics('AAPL')
+    assert analyzer._calculate_growth_score(metrics) == pytest.approx(66.66)
+
+    metrics = metrics.assign(freeCashflow=5e8)
+    assert analyzer._calculate_growth_score(metrics) == pytest.approx(99.99)
+
+def test_score_kernel_matches_numpy():
+    """Test the compiled scoring kernel agrees with the NumPy fallback."""
+    X = np.array([
+        [0.3, 2.5, 0.25, 0.2, 1e9, 15.0, 2.0, 1.2, 0.2, 0.25, 5e8],
+        [1.5, 0.8, 0.05, 0.02, 5e8, 50.0, 5.0, 3.0, -0.05, -0.10, -1e6],
+        [np.nan, 2.5, 0.25, 0.2, 1e9, 15.0, 2.0, 1.2, 0.2, 0.25, np.nan]
+    ])
+    thr = np.array([0.5, 1.5, 0.15, 0.1, 1e9, 25, 3, 2, 0.1, 0.15, 0.0])
+    expected = scoring_kernels._score_all_numpy(
+        X, thr, scoring_kernels.UPPER_BOUND, scoring_kernels.WEIGHTS
+    )
+    np.testing.assert_allclose(scoring_kernels.score_all(X, thr), expected)
+
+def test_metrics_as_series(analyzer):
+    """Test that a Series of metrics scores the same as a one-row DataFrame."""
+    row = _METRICS.iloc[0]
+    assert analyzer._calculate_quality_score(row) == analyzer._calculate_quality_score(_METRICS)
+    assert analyzer._analyze_profitability(row) == analyzer._analyze_profitability(_METRICS)
+
+    expected = analyzer.analyze_ticker('AAPL')
+    analyzer.data_fetcher.get_key_metrics.return_value = row
+    assert analyzer.analyze_ticker('AAPL') == expected
+
+def test_single_score_kernels_match_score_all():
+    """Test the per-score kernels agree with the batch kernel, NaN included."""
+    thr = np.array([0.5, 1.5, 0.15, 0.1, 1e9, 25, 3, 2, 0.1, 0.15, 0.0])
+    for x in (
+        np.array([0.3, 2.5, 0.25, 0.2, 1e9, 15.0, 2.0, 1.2, 0.2, 0.25, 5e8]),
+        np.array([np.nan, 0.8, 0.25, 0.02, 5e8, 15.0, np.nan, 3.0, 0.2, -0.10, np.nan])
+    ):
+        expected = scoring_kernels.score_all(x.reshape(1, -1), thr)[0]
+        assert scoring_kernels.quality_score(x, thr) == pytest.approx(expected[0])
+        assert scoring_kernels.value_score(x, thr) == pytest.approx(expected[1])
+        assert scoring_kernels.growth_score(x, thr) == pytest.approx(expected[2])
+
+def test_screen(analyzer):
+    """Test that screening keeps only tickers passing every threshold."""
+    metrics = pd.DataFrame({
+        'earningsGrowth': [0.25, 0.25, 0.05, np.nan],
+        'currentRatio': [2.5, 1.0, 2.5, 2.5],
+        'debtToEquity': [0.3, 0.3, 0.3, 0.3]
+    }, index=['AAPL', 'MSFT', 'GOOGL', 'AMZN'])
+    analyzer.data_fetcher.get_key_metrics_bulk.side_effect = None
+    analyzer.data_fetcher.get_key_metrics_bulk.return_value = metrics
+
+    result = analyzer.screen(['AAPL', 'MSFT', 'GOOGL', 'AMZN'])
+    assert list(result.index) == ['AAPL']
+
+def test_screen_reads_thresholds(analyzer):
+    """Test that screening reads Thresholds, where an unset criterion passes no ticker."""
+    metrics = pd.DataFrame({
+        'earningsGrowth': [0.01, 0.25],
+        'currentRatio': [2.5, 1.0],
+        'debtToEquity': [0.3, 0.3]
+    }, index=['AAPL', 'MSFT'])
+    analyzer.data_fetcher.get_key_metrics_bulk.side_effect = None
+    analyzer.data_fetcher.get_key_metrics_bulk.return_value = metrics
+
+    analyzer.th = dataclasses.replace(analyzer.th, min_eps_growth=0.0)
+    assert list(analyzer.screen(['AAPL', 'MSFT']).index) == ['AAPL']
+    analyzer.th = dataclasses.replace(analyzer.th, min_eps_growth=float('nan'))
+    assert analyzer.screen(['AAPL', 'MSFT']).empty
+
+def test_profit_margin_threshold_from_thresholds(analyzer):
+    """Test that the profitability check reads its margin threshold from the Thresholds dataclass."""
+    assert analyzer.th.min_profit_margin == 0.1
+    assert len(analyzer._thresholds) == len(scoring_kernels.METRIC_ORDER)
+    metrics = pd.DataFrame([{'returnOnEquity': 0.25, 'profitMargins': 0.05}])
+    assert analyzer._analyze_profitability(metrics) == 50
+
+def test_shipped_config_sets_every_threshold(mock_data_fetcher):
+    """Test that the shipped config sets every threshold, so a strong stock can score full value points."""
+    analyzer = BuffetologyAnalyzer(mock_data_fetcher, ConfigLoader())
+    assert not np.isnan(dataclasses.astuple(analyzer.th)).any()
+    assert analyzer._calculate_value_score(_METRICS) == 100
+
+def test_profitability_with_shipped_config(mock_data_fetcher):
+    """Test that profit margin counts towards profitability with the shipped config."""
+    analyzer = BuffetologyAnalyzer(mock_data_fetcher, ConfigLoader())
+    assert analyzer._analyze_profitability(_METRICS) == 100
+    metrics = pd.DataFrame([{'returnOnEquity': 0.05, 'profitMargins': 0.2}])
+    assert analyzer._analyze_profitability(metrics) == 50
@@ -0,0 +1,171 @@
+import pytest
+import json
+import time
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from buffetology.cache.cache_manager import CacheManager
+
+@pytest.fixture
+def cache_manager(tmp_path):
+    """Create a cache manager backed by a temporary directory."""
+    return CacheManager(str(tmp_path / "cache"), expiry_days=7)
+
+def test_set_and_get(cache_manager):
+    """Test that stored values round-trip through the cache."""
+    value = {'marketCap': 1000000000, 'trailingPE': 16.2}
+    cache_manager.set('AAPL_metrics', value)
+    assert cache_manager.get('AAPL_metrics') == value
+
+def test_cache_miss(cache_manager):
+    """Test that unknown keys return None."""
+    assert cache_manager.get('missing') is None
+
+def test_expired_entry(cache_manager):
+    """Test that entries older than the expiry are treated as misses."""
+    cache_manager.set('sp500_tickers', ['AAPL', 'MSFT'])
+    stale = int(time.time()) - 8 * 86400
+    cache_manager._conn.execute('UPDATE kv SET mtime = ? WHERE key = ?', (stale, 'sp500_tickers'))
+    # A later run starts with an empty in-memory layer and reads the stale row
+    later = CacheManager(str(cache_manager.cache_dir), expiry_days=7)
+    assert later.get('sp500_tickers') is None
+
+def test_clear(cache_manager):
+    """Test that clear removes every entry."""
+    cache_manager.set('a', {'x': 1})
+    cache_manager.set('b', {'y': 2})
+    cache_manager.clear()
+    assert cache_manager.get('a') is None
+    assert cache_manager.get('b') is None
+
+def test_migrates_json_files(tmp_path):
+    """Test that entries from the old per-file JSON layout are imported."""
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    legacy_file = cache_dir / "AAPL_metrics.json"
+    legacy_file.write_text(json.dumps({'marketCap': 1000000000}))
+
+    cache_manager = CacheManager(str(cache_dir), expiry_days=7)
+    assert cache_manager.get('AAPL_metrics') == {'marketCap': 1000000000}
+    assert not legacy_file.exists()
+
+def test_memory_layer(tmp_path):
+    """Test that repeated reads are served from memory and the LRU is bounded."""
+    cache_manager = CacheManager(str(tmp_path / "cache"), expiry_days=7, memory_size=2)
+    cache_manager.set('a', {'x': 1})
+    cache_manager.set('b', {'y': 2})
+    cache_manager.set('c', {'z': 3})
+
+    assert cache_manager.get('c') == {'z': 3}
+    assert cache_manager.get('a') == {'x': 1}
+    stats = cache_manager.stats()
+    assert stats['memory_hits'] == 1
+    assert stats['disk_hits'] == 1
+    assert stats['memory_entries'] == 2
+
+def test_memory_layer_isolates_values(cache_manager):
+    """Test that mutating a stored or returned list doesn't change what later reads see."""
+    tickers = ['AAPL', 'MSFT']
+    cache_manager.set('sp500_tickers', tickers)
+    tickers.append('GOOGL')
+    cache_manager.get('sp500_tickers').append('ZZZ')
+
+    assert cache_manager.get('sp500_tickers') == ['AAPL', 'MSFT']
+    assert cache_manager.stats()['memory_hits'] == 2
+
+def test_memory_layer_isolates_frames_without_copy_on_write(cache_manager):
+    """Test that in-place writes to a returned frame don't reach the cached one on pandas 2."""
+    cache_manager.set('AAPL_price', pd.DataFrame({'Close': [100.0, 102.0]}))
+    with patch('buffetology.cache.cache_manager._copy_on_write', return_value=False):
+        result = cache_manager.get('AAPL_price')
+        cached = cache_manager._mem['AAPL_price'][1]
+        assert not np.shares_memory(result['Close'].to_numpy(), cached['Close'].to_numpy())
+        result.iloc[0, 0] = 0.0
+        result['Close'] *= 2
+
+        assert list(cache_manager.get('AAPL_price')['Close']) == [100.0, 102.0]
+
+def test_concurrent_access(cache_manager):
+    """Test that the cache can be shared by worker threads."""
+    def worker(i):
+        cache_manager.set(f'key_{i}', {'value': i})
+        return cache_manager.get(f'key_{i}')
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(worker, range(64)))
+    assert results == [{'value': i} for i in range(64)]
+
+def test_dataframe_round_trip(cache_manager):
+    """Test that DataFrames keep their index and dtypes through the disk store."""
+    dates = pd.date_range('2023-01-01', periods=3, freq='D')
+    frame = pd.DataFrame({'Close': [100.0, 102.0, 105.0], 'Volume': [10, 20, 30]}, index=dates)
+    cache_manager.set('AAPL_price', frame)
+
+    later = CacheManager(str(cache_manager.cache_dir), expiry_days=7)
+    pd.testing.assert_frame_equal(later.get('AAPL_price'), frame, check_freq=False)
+
+def test_from_config(tmp_path):
+    """Test building a cache manager from the cache section of the config."""
+    cache_manager = CacheManager.from_config({
+        'enabled': True,
+        'directory': str(tmp_path / "cache"),
+        'expiry_days': 3,
+        'memory_entries': 16
+    })
+    assert cache_manager.expiry_days == 3
+    assert cache_manager.memory_size == 16
+
+def test_cold_dataframe_stored_as_parquet(cache_manager):
+    """Test that cold DataFrames are stored as Parquet and read back unchanged."""
+    pytest.importorskip('pyarrow')
+    dates = pd.date_range('2023-01-01', periods=3, freq='D')
+    frame = pd.DataFrame({'Close': [100.0, 102.0, 105.0]}, index=dates)
+    cache_manager.set('AAPL_price', frame, kind='cold')
+
+    stored = cache_manager._conn.execute('SELECT value FROM kv WHERE key = ?', ('AAPL_price',)).fetchone()[0]
+    assert stored.startswith(b'PAR1')
+    later = CacheManager(str(cache_manager.cache_dir), expiry_days=7)
+    pd.testing.assert_frame_equal(later.get('AAPL_price'), frame, check_freq=False)
+
+def test_cold_dataframe_with_date_columns(cache_manager):
+    """Test that frames Parquet can't store, like date-labelled statements, still round-trip."""
+    dates = pd.date_range('2021-12-31', periods=3, freq='YE')
+    frame = pd.DataFrame([[100.0, 110.0, 121.0]], index=['Revenue'], columns=dates)
+    cache_manager.set('AAPL_financials__income', frame, kind='cold')
+
+    later = CacheManager(str(cache_manager.cache_dir), expiry_days=7)
+    pd.testing.assert_frame_equal(later.get('AAPL_financials__income'), frame, check_freq=False)
+
+def test_dict_of_frames(cache_manager):
+    """Test that a dict of DataFrames is stored frame by frame and read back whole."""
+    frames = {
+        'income': pd.DataFrame({'Revenue': [100.0, 110.0]}),
+        'balance': pd.DataFrame({'Total Assets': [200.0, 220.0]})
+    }
+    cache_manager.set('AAPL_financials', frames, kind='cold')
+
+    later = CacheManager(str(cache_manager.cache_dir), expiry_days=7)
+    result = later.get('AAPL_financials')
+    assert list(result) == ['income', 'balance']
+    pd.testing.assert_frame_equal(result['balance'], frames['balance'])
+
+    # A frame lost from the store invalidates the whole group
+    later._conn.execute('DELETE FROM kv WHERE key = ?', ('AAPL_financials__income',))
+    assert CacheManager(str(cache_manager.cache_dir), expiry_days=7).get('AAPL_financials') is None
+
+def test_max_age(cache_manager):
+    """Test that max_age treats entries older than it as missing."""
+    cache_manager.set('sp500_tickers', ['AAPL', 'MSFT'])
+    assert cache_manager.get('sp500_tickers', max_age=60) == ['AAPL', 'MSFT']
+    with patch('time.time', return_value=time.time() + 120):
+        assert cache_manager.get('sp500_tickers', max_age=60) is None
+        assert cache_manager.get('sp500_tickers') == ['AAPL', 'MSFT']
+
+def test_dict_stored_as_json(cache_manager):
+    """Test that metric dicts are stored as JSON text, not pickled."""
+    value = {'marketCap': 1000000000, 'trailingPE': 16.2, 'pegRatio': None}
+    cache_manager.set('AAPL_metrics', value)
+    row = cache_manager._conn.execute('SELECT value FROM kv WHERE key = ?', ('AAPL_metrics',)).fetchone()
+    assert json.loads(row[0]) == value
+    assert CacheManager(str(cache_manager.cache_dir), expiry_days=7).get('AAPL_metrics') == value
@@ -2,7 +2,7 @@ import pytest
 import os
 import yaml
 from pathlib import Path
-from buffetology.config.config_loader import ConfigLoader
+from buffetology.config.config_loader import ConfigLoader, _load_yaml_cached
 
 @pytest.fixture
 def test_config():
@@ -99,4 +99,36 @@ def test_missing_required_sections(tmp_path):
     with open(config_file, 'w') as f:
         yaml.dump({'data_provider': {}}, f)
     with pytest.raises(ValueError):
-        ConfigLoader(str(config_file)) 
\ No newline at end of file
+        ConfigLoader(str(config_file)) 
+
+def test_cached_config_is_isolated(test_config_file):
+    """Test that loaders sharing a parsed file don't see each other's changes."""
+    first = ConfigLoader(test_config_file)
+    first.config['analysis']['sp500_top_n'] = 10
+    second = ConfigLoader(test_config_file)
+    assert second.config['analysis']['sp500_top_n'] == 50
+
+def test_missing_required_fields(test_config):
+    """Test that the error names every missing field of a section."""
+    del test_config['cache']['enabled']
+    del test_config['cache']['expiry_days']
+    with pytest.raises(ValueError, match=r"cache fields \['enabled', 'expiry_days'\]"):
+        ConfigLoader(test_config)
+
+def test_default_config_parsed_once():
+    """Test that the bundled default config is parsed once per process."""
+    ConfigLoader()
+    hits = _load_yaml_cached.cache_info().hits
+    ConfigLoader()
+    assert _load_yaml_cached.cache_info().hits == hits + 1
+
+def test_empty_section(test_config):
+    """Test that a section left empty in YAML is accepted as an empty mapping."""
+    test_config['output'] = None
+    assert ConfigLoader(test_config).get_output_config() == {}
+
+def test_section_must_be_mapping(test_config):
+    """Test that a section that isn't a mapping fails validation."""
+    test_config['analysis'] = []
+    with pytest.raises(ValueError, match="Section 'analysis' in config must be a mapping"):
+        ConfigLoader(test_config)
@@ -0,0 +1,105 @@
+import pytest
+from unittest.mock import Mock, patch
+import pandas as pd
+from buffetology.data_fetchers.fmp_fetcher import _PROCESS_POOL_MIN_TICKERS, FMPFetcher, _parse_financials
+
+@pytest.fixture
+def fmp_fetcher(mock_cache_manager, tmp_cwd):
+    """Create an FMPFetcher instance with a mock cache manager."""
+    return FMPFetcher(cache_manager=mock_cache_manager)
+
+def test_get_key_metrics(fmp_fetcher):
+    """Test that key metrics come back as one typed row with the analyzer's names."""
+    response = [{'marketCap': 1000000000, 'peRatio': 16.2, 'pbRatio': 2.5, 'roe': 0.25}]
+    with patch.object(fmp_fetcher, '_make_request_json', return_value=response):
+        result = fmp_fetcher.get_key_metrics('AAPL')
+
+    assert len(result) == 1
+    assert all(pd.api.types.is_float_dtype(dtype) for dtype in result.dtypes)
+    assert result.loc[0, 'trailingPE'] == 16.2
+    assert result.loc[0, 'returnOnEquity'] == 0.25
+    assert pd.isna(result.loc[0, 'pegRatio'])
+
+def test_key_metrics_feed_analyzer_matrix(fmp_fetcher):
+    """Test that Arrow-backed key metrics convert to the analyzer's float matrix."""
+    pytest.importorskip('pyarrow')
+    response = [{'marketCap': 1000000000, 'peRatio': 16.2}]
+    with patch.object(fmp_fetcher, '_make_request_json', return_value=response):
+        result = fmp_fetcher.get_key_metrics('AAPL')
+
+    assert isinstance(result['trailingPE'].dtype, pd.ArrowDtype)
+    values = result.to_numpy(dtype='float64', na_value=float('nan'))
+    assert values[0, list(result.columns).index('trailingPE')] == 16.2
+
+def test_session_caches_responses(fmp_fetcher):
+    """Test that requests go through a revalidating response cache."""
+    requests_cache = pytest.importorskip('requests_cache')
+    assert isinstance(fmp_fetcher.session, requests_cache.CachedSession)
+    assert 'apikey' in fmp_fetcher.session.settings.ignored_parameters
+
+def test_make_request_decodes_body(fmp_fetcher):
+    """Test that responses are decoded from the raw body and the API key is appended."""
+    response = Mock(content=b'[{"symbol": "AAPL"}]')
+    with patch.object(fmp_fetcher.session, 'get', return_value=response) as mock_get:
+        assert fmp_fetcher._make_request_json("income-statement/AAPL?limit=120") == [{'symbol': 'AAPL'}]
+    assert mock_get.call_args[0][0].endswith("income-statement/AAPL?limit=120&apikey=")
+
+def test_get_financial_statements_dtypes(fmp_fetcher):
+    """Test that statements are built with declared dtypes, nulls included."""
+    def response(endpoint):
+        return [
+            {'date': '2023-09-30', 'symbol': 'AAPL', 'revenue': 383285000000, 'netIncome': 96995000000},
+            {'date': '2022-09-24', 'symbol': 'AAPL', 'revenue': None, 'netIncome': 99803000000}
+        ]
+
+    with patch.object(fmp_fetcher, '_make_request_json', side_effect=response):
+        result = fmp_fetcher.get_financial_statements('AAPL')
+
+    income = result['income']
+    assert income['revenue'].dtype == 'float64'
+    assert income['revenue'].iloc[0] == 383285000000
+    assert pd.isna(income['revenue'].iloc[1])
+    assert income['date'].dtype == 'datetime64[ns]'
+    assert income['symbol'].dtype == 'string'
+    assert result['cashflow']['netIncome'].dtype == 'float64'
+
+def test_statement_frame_falls_back_on_unexpected_types(fmp_fetcher):
+    """Test that a field with an unexpected JSON type is still coerced."""
+    def response(endpoint):
+        return [{'date': '2023-09-30', 'cik': 320193, 'revenue': '383285000000'}]
+
+    with patch.object(fmp_fetcher, '_make_request_json', side_effect=response):
+        income = fmp_fetcher.get_financial_statements('AAPL')['income']
+
+    assert income['revenue'].iloc[0] == 383285000000
+    assert income['cik'].iloc[0] == '320193'
+
+def test_fetch_many(fmp_fetcher):
+    """Test that statements are fetched for every ticker and failures are left out."""
+    async def response(client, endpoint):
+        if endpoint.startswith('income-statement/BAD'):
+            raise Exception("API Error")
+        return [{'date': '2023-09-30', 'revenue': 383285000000}]
+
+    with patch.object(fmp_fetcher, '_make_request_async', side_effect=response):
+        result = fmp_fetcher.fetch_many(['AAPL', 'BAD', 'MSFT', 'AAPL'])
+
+    assert list(result) == ['AAPL', 'MSFT']
+    assert set(result['AAPL']) == {'income', 'balance', 'cashflow'}
+    assert result['MSFT']['income']['revenue'].iloc[0] == 383285000000
+
+def test_fetch_many_parses_in_processes(fmp_fetcher):
+    """Test that a large batch parsed in worker processes matches in-process parsing."""
+    tickers = [f"T{i}" for i in range(_PROCESS_POOL_MIN_TICKERS)]
+
+    async def response(client, endpoint):
+        return [{'date': '2023-09-30', 'symbol': endpoint.split('/')[1].split('?')[0], 'revenue': 1000.0}]
+
+    with patch.object(fmp_fetcher, '_make_request_async', side_effect=response):
+        result = fmp_fetcher.fetch_many(tickers)
+
+    assert list(result) == tickers
+    expected = _parse_financials(
+        {name: [{'date': '2023-09-30', 'symbol': 'T3', 'revenue': 1000.0}] for name in ('income', 'balance', 'cashflow')}
+    )
+    pd.testing.assert_frame_equal(result['T3']['income'], expected['income'])
@@ -0,0 +1,28 @@
+import pytest
+from unittest.mock import Mock, patch
+import pandas as pd
+from buffetology.data_fetchers.ft_fetcher import FinancialTimesFetcher
+
+@pytest.fixture
+def ft_fetcher(mock_cache_manager, tmp_cwd):
+    """Create a FinancialTimesFetcher instance with a mock cache manager."""
+    return FinancialTimesFetcher(cache_manager=mock_cache_manager)
+
+def test_cache_hit_skips_login(ft_fetcher, mock_cache_manager):
+    """Test that cached data is served without logging in."""
+    frame = pd.DataFrame({'Revenue': [100, 110]})
+    mock_cache_manager.get.return_value = {'income': frame, 'balance': frame, 'cashflow': frame}
+    with patch.object(FinancialTimesFetcher, '_create_session') as mock_login:
+        result = ft_fetcher.get_financial_statements('AAPL')
+    assert set(result) == {'income', 'balance', 'cashflow'}
+    mock_login.assert_not_called()
+
+def test_login_once_on_cache_miss(ft_fetcher):
+    """Test that the session logs in on first use and is then reused."""
+    session = Mock()
+    session.get.return_value.content = b'<html></html>'
+    with patch.object(FinancialTimesFetcher, '_create_session', return_value=session) as mock_login:
+        ft_fetcher.get_key_metrics('AAPL')
+        ft_fetcher.get_stock_price('AAPL', '2023-01-01', '2023-01-03')
+    mock_login.assert_called_once()
+    assert session.get.call_count == 2
@@ -1,10 +1,14 @@
 import pytest
-from unittest.mock import Mock, patch
+from contextlib import contextmanager
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
 import pandas as pd
 import yfinance as yf
-from datetime import datetime, timedelta
+from yfinance.exceptions import YFRateLimitError
 from buffetology.data_fetchers.yahoo_fetcher import YahooFinanceFetcher
 from buffetology.cache.cache_manager import CacheManager
+from buffetology.tests.fakes import FakeTicker
 
 @pytest.fixture
 def mock_config():
@@ -32,107 +36,174 @@ def mock_config():
         }
     }
 
-@pytest.fixture
-def mock_cache_manager():
-    """Create a mock cache manager."""
-    cache_manager = Mock()
-    cache_manager.get.return_value = None
-    return cache_manager
-
 @pytest.fixture
 def yahoo_fetcher(mock_config, mock_cache_manager):
     """Create a YahooFinanceFetcher instance with a mock cache manager."""
     return YahooFinanceFetcher(config=mock_config, cache_manager=mock_cache_manager)
 
-def test_get_financial_statements(yahoo_fetcher):
-    """Test fetching financial statements."""
-    with patch('yfinance.Ticker') as mock_ticker:
-        # Mock the yfinance Ticker object with proper date indices
-        dates = pd.date_range(end=datetime.now(), periods=3, freq='YE')
-        mock_stock = Mock()
-        mock_stock.financials = pd.DataFrame({
+def _statement_ticker(symbol, dates):
+    """Build a FakeTicker with three years of financial statements."""
+    return FakeTicker(
+        symbol,
+        financials=pd.DataFrame({
             'Revenue': [100, 110, 121],
             'Net Income': [10, 12, 15]
-        }, index=dates)
-        mock_stock.balance_sheet = pd.DataFrame({
+        }, index=dates),
+        balance_sheet=pd.DataFrame({
             'Total Assets': [200, 220, 240],
             'Total Liabilities': [80, 85, 90]
-        }, index=dates)
-        mock_stock.cashflow = pd.DataFrame({
+        }, index=dates),
+        cashflow=pd.DataFrame({
             'Operating Cash Flow': [20, 22, 25],
             'Free Cash Flow': [15, 17, 20]
         }, index=dates)
-        mock_ticker.return_value = mock_stock
+    )
 
-        result = yahoo_fetcher.get_financial_statements('AAPL')
-        assert isinstance(result, dict)
-        assert all(isinstance(df, pd.DataFrame) for df in result.values())
-        assert not any(df.empty for df in result.values())
+def test_get_financial_statements(yahoo_fetcher, patch_yf, annual_dates):
+    """Test fetching financial statements."""
+    patch_yf['AAPL'] = _statement_ticker('AAPL', annual_dates)
 
-def test_get_key_metrics(yahoo_fetcher):
+    result = yahoo_fetcher.get_financial_statements('AAPL')
+    assert isinstance(result, dict)
+    assert all(isinstance(df, pd.DataFrame) for df in result.values())
+    assert not any(df.empty for df in result.values())
+
+def test_get_key_metrics(yahoo_fetcher, patch_yf):
     """Test fetching key metrics."""
-    with patch('yfinance.Ticker') as mock_ticker:
-        mock_stock = Mock()
-        mock_stock.info = {
-            'marketCap': 1000000000,
-            'forwardPE': 15.5,
-            'trailingPE': 16.2,
-            'priceToBook': 5.4,
-            'returnOnEquity': 0.25,
-            'returnOnAssets': 0.15,
-            'currentRatio': 2.1,
-            'debtToEquity': 0.45,
-            'profitMargins': 0.20,
-            'revenueGrowth': 0.15,
-            'earningsGrowth': 0.18,
-            'pegRatio': 1.2
-        }
-        mock_ticker.return_value = mock_stock
+    info = {
+        'marketCap': 1000000000,
+        'forwardPE': 15.5,
+        'trailingPE': 16.2,
+        'priceToBook': 5.4,
+        'returnOnEquity': 0.25,
+        'returnOnAssets': 0.15,
+        'currentRatio': 2.1,
+        'debtToEquity': 0.45,
+        'profitMargins': 0.20,
+        'revenueGrowth': 0.15,
+        'earningsGrowth': 0.18,
+        'pegRatio': 1.2
+    }
+    patch_yf['AAPL'] = FakeTicker('AAPL', info=info)
 
-        result = yahoo_fetcher.get_key_metrics('AAPL')
-        assert isinstance(result, pd.DataFrame)
-        assert not result.empty
-        assert len(result) == 1
-        assert all(key in result.columns for key in mock_stock.info.keys())
+    result = yahoo_fetcher.get_key_metrics('AAPL')
+    assert isinstance(result, pd.DataFrame)
+    assert not result.empty
+    assert len(result) == 1
+    assert all(key in result.columns for key in info.keys())
+    assert (result.dtypes == 'float64').all()
+    # Metrics are stored column-major, one contiguous array per metric
+    assert result.to_numpy().flags.f_contiguous
 
-def test_get_sp500_tickers(yahoo_fetcher):
-    """Test fetching S&P 500 tickers."""
-    with patch('yfinance.Ticker') as mock_ticker:
-        mock_stock = Mock()
-        mock_stock.info = {
-            'components': ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META']
-        }
-        mock_ticker.return_value = mock_stock
+def _constituents_page(symbols):
+    """Build a minimal Wikipedia page holding the S&P 500 constituents table."""
+    rows = ''.join(f'<tr><td><a href="#">{symbol}</a></td><td>Name</td></tr>' for symbol in symbols)
+    return f'<html><body><table id="constituents"><tr><th>Symbol</th><th>Security</th></tr>{rows}</table></body></html>'.encode()
+
+@contextmanager
+def _patch_wikipedia(page=b'<html></html>'):
+    """Patch the HTTP session used to download the Wikipedia constituents page."""
+    with patch('buffetology.data_fetchers.yahoo_fetcher.create_pooled_session') as mock_session:
+        session = mock_session.return_value.__enter__.return_value
+        session.get.return_value.content = page
+        yield session
 
+def test_get_sp500_tickers(yahoo_fetcher, mock_cache_manager):
+    """Test fetching S&P 500 tickers from the Wikipedia constituents table."""
+    with _patch_wikipedia(_constituents_page(['AAPL', 'MSFT', 'BRK.B', 'AMZN', 'META'])):
         result = yahoo_fetcher.get_sp500_tickers(limit=3)
         assert isinstance(result, list)
-        assert len(result) == 3
+        assert result == ['AAPL', 'MSFT', 'BRK-B']
         assert all(isinstance(ticker, str) for ticker in result)
+    # The list is kept for a day rather than the cache's usual expiry
+    assert mock_cache_manager.get.call_args.kwargs['max_age'] == 24 * 60 * 60
+
+def test_get_sp500_tickers_fallback(yahoo_fetcher):
+    """Test that a page without the constituents table falls back to the built-in list."""
+    with _patch_wikipedia():
+        result = yahoo_fetcher.get_sp500_tickers(limit=5)
+    assert result == ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META']
+
+def _price_history():
+    """Build three days of price history."""
+    dates = pd.date_range(start='2023-01-01', end='2023-01-03', freq='D')
+    return pd.DataFrame({
+        'Close': [100, 102, 105],
+        'Open': [99, 101, 104],
+        'High': [101, 103, 106],
+        'Low': [98, 100, 103]
+    }, index=dates, dtype=float)
 
 def test_get_stock_price(yahoo_fetcher):
     """Test fetching stock prices."""
-    with patch('yfinance.Ticker') as mock_ticker:
-        dates = pd.date_range(start='2023-01-01', end='2023-01-03', freq='D')
-        mock_stock = Mock()
-        mock_stock.history.return_value = pd.DataFrame({
-            'Close': [100, 102, 105],
-            'Open': [99, 101, 104],
-            'High': [101, 103, 106],
-            'Low': [98, 100, 103]
-        }, index=dates)
-        mock_ticker.return_value = mock_stock
+    with patch('yfinance.download') as mock_download:
+        mock_download.return_value = pd.concat({'AAPL': _price_history()}, axis=1)
 
         result = yahoo_fetcher.get_stock_price('AAPL', '2023-01-01', '2023-01-03')
         assert isinstance(result, pd.DataFrame)
         assert not result.empty
         assert all(col in result.columns for col in ['Close', 'Open', 'High', 'Low'])
 
+def test_get_stock_price_lowercase(yahoo_fetcher):
+    """Test that a lowercase symbol gets its prices, as Ticker.history accepted it."""
+    with patch('yfinance.download') as mock_download:
+        mock_download.return_value = pd.concat({'AAPL': _price_history()}, axis=1)
+
+        result = yahoo_fetcher.get_stock_price('aapl', '2023-01-01', '2023-01-03')
+        assert list(result['Close']) == [100, 102, 105]
+
+def test_get_stock_price_failures(yahoo_fetcher):
+    """Test that a failed download raises while a symbol without data comes back empty."""
+    with patch('yfinance.download') as mock_download:
+        mock_download.return_value = pd.concat({'BAD': _price_history() * float('nan')}, axis=1)
+        result = yahoo_fetcher.get_stock_price('BAD', '2023-01-01', '2023-01-03')
+        assert result.empty
+        assert list(result.columns) == ['Close', 'Open', 'High', 'Low']
+
+        mock_download.side_effect = Exception("API Error")
+        with pytest.raises(ValueError):
+            yahoo_fetcher.get_stock_price('AAPL', '2023-01-01', '2023-01-03')
+
+def test_cached_prices_keep_dtype_and_values(mock_config, tmp_path):
+    """Test that prices read back from the cache match a fresh fetch exactly."""
+    fetcher = YahooFinanceFetcher(config=mock_config, cache_manager=CacheManager(str(tmp_path), expiry_days=7))
+    dates = pd.date_range(start='2023-01-01', periods=2, freq='D')
+    history = pd.DataFrame({
+        'Close': [712345.67, 712400.01],
+        'Volume': [123456789.0, 98765432.0]
+    }, index=dates)
+    with patch('yfinance.download', return_value=pd.concat({'BRK-A': history}, axis=1)) as mock_download:
+        fresh = fetcher.get_stock_price('BRK-A', '2023-01-01', '2023-01-03')
+        cached = fetcher.get_stock_price('BRK-A', '2023-01-01', '2023-01-03')
+        assert mock_download.call_count == 1
+
+    # A new process reads the entry from disk rather than the in-memory layer
+    fetcher.cache_manager = CacheManager(str(tmp_path), expiry_days=7)
+    from_disk = fetcher.get_stock_price('BRK-A', '2023-01-01', '2023-01-03')
+    for result in (fresh, cached, from_disk):
+        assert (result.dtypes == 'float64').all()
+        assert result['Close'].iloc[0] == 712345.67
+        assert result['Volume'].iloc[0] == 123456789
+
+def test_get_stock_prices(yahoo_fetcher):
+    """Test fetching prices for several tickers as one column-MultiIndex frame."""
+    with patch('yfinance.download') as mock_download:
+        mock_download.return_value = pd.concat(
+            {'AAPL': _price_history(), 'MSFT': _price_history() * 3}, axis=1
+        )
+
+        result = yahoo_fetcher.get_stock_prices(['AAPL', 'MSFT'], '2023-01-01', '2023-01-03')
+        assert mock_download.call_count == 1
+        assert list(result.columns.get_level_values(0).unique()) == ['AAPL', 'MSFT']
+        assert list(result[('MSFT', 'Close')]) == [300, 306, 315]
+
 def test_cache_hit(yahoo_fetcher, mock_cache_manager):
     """Test cache hit functionality."""
+    pa = pytest.importorskip('pyarrow')
     cached_data = {
-        'income': {'Revenue': [100, 110], 'Net Income': [10, 12]},
-        'balance': {'Total Assets': [200, 220], 'Total Liabilities': [80, 85]},
-        'cash': {'Operating Cash Flow': [20, 22], 'Free Cash Flow': [15, 17]}
+        'income': pa.Table.from_pydict({'Revenue': [100, 110], 'Net Income': [10, 12]}).to_pandas(),
+        'balance': pa.Table.from_pydict({'Total Assets': [200, 220], 'Total Liabilities': [80, 85]}).to_pandas(),
+        'cash': pa.Table.from_pydict({'Operating Cash Flow': [20, 22], 'Free Cash Flow': [15, 17]}).to_pandas()
     }
     mock_cache_manager.get.return_value = cached_data
 
@@ -141,31 +212,144 @@ def test_cache_hit(yahoo_fetcher, mock_cache_manager):
     assert all(isinstance(df, pd.DataFrame) for df in result.values())
     assert not any(df.empty for df in result.values())
 
-def test_cache_functionality(yahoo_fetcher, mock_cache_manager):
+def test_cache_functionality(yahoo_fetcher, mock_cache_manager, patch_yf, annual_dates):
     """Test that cache is being used."""
-    with patch('yfinance.Ticker') as mock_ticker:
-        dates = pd.date_range(end=datetime.now(), periods=3, freq='YE')
-        mock_stock = Mock()
-        mock_stock.financials = pd.DataFrame({
-            'Revenue': [100, 110, 121],
-            'Net Income': [10, 12, 15]
-        }, index=dates)
-        mock_stock.balance_sheet = pd.DataFrame({
-            'Total Assets': [200, 220, 240],
-            'Total Liabilities': [80, 85, 90]
-        }, index=dates)
-        mock_stock.cashflow = pd.DataFrame({
-            'Operating Cash Flow': [20, 22, 25],
-            'Free Cash Flow': [15, 17, 20]
-        }, index=dates)
-        mock_ticker.return_value = mock_stock
+    patch_yf['AAPL'] = _statement_ticker('AAPL', annual_dates)
 
-        yahoo_fetcher.get_financial_statements('AAPL')
-        assert mock_cache_manager.set.call_count > 0
+    yahoo_fetcher.get_financial_statements('AAPL')
+    assert mock_cache_manager.set.call_count > 0
 
-def test_error_handling(yahoo_fetcher):
+def test_error_handling(yahoo_fetcher, patch_yf):
     """Test error handling."""
+    with pytest.raises(ValueError):
+        yahoo_fetcher.get_financial_statements('INVALID')
+
+def test_get_key_metrics_bulk(yahoo_fetcher, patch_yf):
+    """Test fetching key metrics for several tickers at once."""
+    for symbol, pe in [('AAPL', 16.2), ('MSFT', 30.1)]:
+        patch_yf[symbol] = FakeTicker(symbol, info={'trailingPE': pe, 'marketCap': 1000000000})
+
+    result = yahoo_fetcher.get_key_metrics_bulk(['AAPL', 'MSFT', 'BAD'])
+    assert list(result.index) == ['AAPL', 'MSFT']
+    assert result.loc['MSFT', 'trailingPE'] == 30.1
+    assert result['trailingPE'].to_numpy().flags.c_contiguous
+
+def test_get_key_metrics_bulk_retries_rate_limits(yahoo_fetcher):
+    """Test that a 429 while fetching metrics in bulk is retried with backoff."""
+    with patch('yfinance.Ticker') as mock_ticker, \
+            patch('buffetology.data_fetchers.yahoo_fetcher.AsyncLimiter', None), \
+            patch('buffetology.data_fetchers.yahoo_fetcher.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+        stock = Mock()
+        stock.info = {'trailingPE': 16.2}
+        mock_ticker.side_effect = [YFRateLimitError(), stock]
+
+        result = yahoo_fetcher.get_key_metrics_bulk(['AAPL'])
+        assert result.loc['AAPL', 'trailingPE'] == 16.2
+        assert mock_sleep.await_count == 1
+
+def test_get_sp500_tickers_cached(yahoo_fetcher):
+    """Test that the S&P 500 list is fetched once per process."""
+    with _patch_wikipedia(_constituents_page(['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META'])) as session:
+        assert yahoo_fetcher.get_sp500_tickers_cached(limit=2) == ['AAPL', 'MSFT']
+        assert len(yahoo_fetcher.get_sp500_tickers_cached()) == 5
+        assert yahoo_fetcher.get_sp500_tickers_cached(limit=0) == []
+        assert session.get.call_count == 1
+
+def test_get_stock_prices_batch(yahoo_fetcher):
+    """Test fetching prices for several tickers with one download."""
+    with patch('yfinance.download') as mock_download:
+        prices = _price_history()
+        # A failed ticker comes back as all-NaN columns
+        mock_download.return_value = pd.concat(
+            {'AAPL': prices, 'BAD': prices * float('nan')}, axis=1
+        )
+
+        result = yahoo_fetcher.get_stock_prices_batch(['AAPL', 'BAD'], '2023-01-01', '2023-01-03')
+        assert mock_download.call_count == 1
+        assert list(result['AAPL']['Close']) == [100, 102, 105]
+        assert result['BAD'].empty
+
+def test_get_stock_prices_batch_lowercase(yahoo_fetcher):
+    """Test that lowercase symbols find yfinance's upper-cased columns and keep their spelling."""
+    with patch('yfinance.download') as mock_download:
+        mock_download.return_value = pd.concat({'AAPL': _price_history()}, axis=1)
+
+        result = yahoo_fetcher.get_stock_prices_batch(['aapl'], '2023-01-01', '2023-01-03')
+        assert list(result) == ['aapl']
+        assert list(result['aapl']['Close']) == [100, 102, 105]
+
+def test_get_many(yahoo_fetcher, patch_yf):
+    """Test fetching one kind of data for several symbols concurrently."""
+    for symbol in ('AAPL', 'MSFT'):
+        patch_yf[symbol] = FakeTicker(symbol, info={'trailingPE': 16.2, 'marketCap': 1000000000})
+
+    result = yahoo_fetcher.get_many(['AAPL', 'BAD', 'MSFT'], 'metrics')
+    assert list(result) == ['AAPL', 'MSFT']
+    assert result['MSFT'].loc[0, 'trailingPE'] == 16.2
+
+def test_get_many_retries_rate_limits(yahoo_fetcher):
+    """Test that 429 responses are retried with backoff."""
+    with patch('yfinance.Ticker') as mock_ticker, \
+            patch('buffetology.data_fetchers.yahoo_fetcher.AsyncLimiter', None), \
+            patch('buffetology.data_fetchers.yahoo_fetcher.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+        stock = Mock()
+        stock.info = {'trailingPE': 16.2}
+        mock_ticker.side_effect = [YFRateLimitError(), YFRateLimitError(), stock]
+
+        result = yahoo_fetcher.get_many(['AAPL'], 'metrics')
+        assert result['AAPL'].loc[0, 'trailingPE'] == 16.2
+        assert mock_sleep.await_count == 2
+
+def test_shared_session(yahoo_fetcher):
+    """Test that every yfinance call reuses the fetcher's HTTP session."""
     with patch('yfinance.Ticker') as mock_ticker:
-        mock_ticker.side_effect = Exception("API Error")
-        with pytest.raises(ValueError):
-            yahoo_fetcher.get_financial_statements('INVALID') 
\ No newline at end of file
+        mock_ticker.return_value.info = {'trailingPE': 16.2}
+        yahoo_fetcher.get_key_metrics('AAPL')
+        yahoo_fetcher.get_key_metrics('MSFT')
+
+        sessions = [call.kwargs['session'] for call in mock_ticker.call_args_list]
+        assert sessions[0] is sessions[1] is yahoo_fetcher._session
+
+def test_ticker_objects_reused(yahoo_fetcher):
+    """Test that one yfinance Ticker is built per symbol."""
+    with patch('yfinance.Ticker') as mock_ticker:
+        mock_ticker.return_value.info = {'trailingPE': 16.2}
+        mock_ticker.return_value.financials = pd.DataFrame({'Revenue': [100]})
+        yahoo_fetcher.get_key_metrics('AAPL')
+        yahoo_fetcher.get_financial_statements('AAPL')
+        assert mock_ticker.call_count == 1
+
+def test_concurrent_calls_share_one_fetch(yahoo_fetcher):
+    """Test that concurrent requests for the same ticker coalesce onto one fetch."""
+    started = threading.Event()
+    release = threading.Event()
+    waiting = threading.Event()
+
+    class WaitedFuture(Future):
+        """Future that reports when a second caller starts waiting on it."""
+        def result(self, timeout=None):
+            waiting.set()
+            return super().result(timeout)
+
+    def slow_info():
+        started.set()
+        release.wait(5)
+        return {'trailingPE': 16.2}
+
+    info = PropertyMock(side_effect=slow_info)
+    with patch('yfinance.Ticker') as mock_ticker, \
+            patch('buffetology.data_fetchers.base_fetcher.Future', WaitedFuture):
+        type(mock_ticker.return_value).info = info
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(yahoo_fetcher.get_key_metrics, 'AAPL')
+            assert started.wait(5)
+            assert ('get_key_metrics', ('AAPL',), ()) in yahoo_fetcher._inflight
+            second = executor.submit(yahoo_fetcher.get_key_metrics, 'AAPL')
+            # Hold the first fetch until the second caller is blocked on its future
+            assert waiting.wait(5)
+            release.set()
+            results = [first.result(), second.result()]
+
+    assert info.call_count == 1
+    assert results[0] is not results[1]
+    assert all(result.loc[0, 'trailingPE'] == 16.2 for result in results)
@@ -5,16 +5,35 @@ setup(
     version="0.1.0",
     packages=find_packages(),
     install_requires=[
-        "pandas>=1.5.0",
-        "numpy>=1.21.0",
-        "yfinance>=0.2.0",
+        "pandas>=2.0,<4",
+        "numpy>=1.23,<3",
+        "yfinance>=0.2.54,<2",
         "pyyaml>=6.0",
-        "tabulate>=0.9.0",
-        "pytest>=7.0.0",
-        "python-dateutil>=2.8.2",
         "requests>=2.28.0",
-        "python-dotenv>=0.21.0",
-        "beautifulsoup4>=4.11.0",
-        "aiohttp>=3.8.0"
+        "lxml>=4.9.0",
+        "aiolimiter>=1.1.0"
     ],
-) 
\ No newline at end of file
+    extras_require={
+        # FMP and Financial Times fetchers, and revalidating HTTP response caching
+        "web": [
+            "beautifulsoup4>=4.11.0",
+            "httpx[http2]>=0.24.0",
+            "requests-cache>=1.0.0"
+        ],
+        # Grid tables from format_results
+        "output": [
+            "tabulate>=0.9.0"
+        ],
+        # Compiled scoring, faster JSON and Arrow/Parquet caching
+        "fast": [
+            "numba>=0.57.0",
+            "orjson>=3.8.0",
+            "pyarrow>=14.0.0"
+        ],
+        "test": [
+            "pytest>=7.0.0",
+            "pytest-mock>=3.10.0",
+            "pytest-xdist>=3.0.0"
+        ]
+    },
+)